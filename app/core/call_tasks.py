@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+from typing import Coroutine
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Voice session task %s failed: %s", task.get_name(), task.exception())
+
+
+class CallTaskGroup:
+    """
+    Every task of one call. ``wait_first()`` returns as soon as one of the
+    ``critical`` tasks (the receive loop, the STT sender and listener) ends,
+    for whatever reason; ``aclose()`` then cancels the rest, including reply
+    turns, and waits at most ``cancel_timeout`` seconds for them to unwind.
+    Tasks still running after that are reported as leaked. Closing twice
+    is a no-op.
+    """
+
+    def __init__(self, cancel_timeout: float) -> None:
+        self.cancel_timeout = cancel_timeout
+        self._tasks: set[asyncio.Task] = set()
+        self._critical: set[asyncio.Task] = set()
+        self._closed = False
+        self.leaked = 0
+
+    def spawn(self, coro: Coroutine, name: str, critical: bool = False) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(_log_failure)
+        if critical:
+            self._critical.add(task)
+        return task
+
+    async def wait_first(self, *also: asyncio.Task) -> asyncio.Task | None:
+        """
+        Wait until a critical task, or one of ``also``, has ended; returns it
+        (None if there are none). A critical task wins a tie.
+        """
+        watched = self._critical.union(also)
+        if not watched:
+            return None
+        done, _ = await asyncio.wait(watched, return_when=asyncio.FIRST_COMPLETED)
+        first = next((task for task in done if task in self._critical), None)
+        if first is None:
+            return done.pop()
+        logger.info("Voice session task %s ended — stopping the call", first.get_name())
+        return first
+
+    async def aclose(self) -> int:
+        """Cancel every task still running; returns how many outlived ``cancel_timeout``."""
+        if self._closed:
+            return self.leaked
+        self._closed = True
+        started = time.perf_counter()
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        leaked: set[asyncio.Task] = set()
+        if pending:
+            _, leaked = await asyncio.wait(pending, timeout=self.cancel_timeout)
+        metrics.call_teardown_seconds.observe(time.perf_counter() - started)
+        self.leaked = len(leaked)
+        if leaked:
+            logger.warning(
+                "%d call tasks still running %.1f s after cancel: %s",
+                len(leaked),
+                self.cancel_timeout,
+                sorted(task.get_name() for task in leaked),
+            )
+        return self.leaked
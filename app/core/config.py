@@ -0,0 +1,139 @@
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    """Deployment tunables, read from environment variables (see .env.example)."""
+
+    # Sarvam endpoints; empty = production. Point at bench/fake_sarvam.py for load tests
+    sarvam_base_url: str = ""   # REST, e.g. http://127.0.0.1:9000
+    sarvam_ws_url: str = ""     # STT/TTS streaming, e.g. ws://127.0.0.1:9000
+
+    # Admission control per process (0 = unlimited). Saturated calls are
+    # queued up to call_queue_timeout, then closed with 1013 (try again later)
+    max_concurrent_calls: int = 0
+    call_queue_timeout: float = 0.0      # 0 = reject immediately when full
+    call_queue_max: int = 50
+    max_inflight_llm_requests: int = 0
+    max_inflight_tts_requests: int = 0
+    drain_timeout: float = 300.0         # POST /admin/drain waits this long for calls to end
+    call_cancel_timeout: float = 2.0     # an ended call's tasks and STT socket get this long to unwind
+
+    # Production server (python serve.py): workers share the port via SO_REUSEPORT
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0              # 0 = one per CPU core
+    warmup_timeout: float = 30.0         # /readyz reports ready after this even if warm-up lags
+
+    # Order feed ("" | "file" | "http") and ahead-of-time greeting rendering
+    order_feed: str = ""
+    order_feed_path: str = ""            # file feed: directory of *.json / *.txt orders
+    order_feed_url: str = ""             # http feed: GET → [{"order_id", "details"}]
+    order_feed_poll_interval: float = 1.0
+    greeting_prerender_concurrency: int = 4
+    greeting_prerender_ttl: float = 900.0    # unused renders are dropped after this
+    greeting_prerender_max_bytes: int = 64 * 1024 * 1024   # PCM held per worker (~35 min of audio)
+
+    # Call recording: inbound/outbound WAV + events.jsonl per call, written in batches
+    recording_enabled: bool = False
+    recording_dir: str = ""               # empty = <system temp>/voice_ai_recordings
+    recording_flush_interval: float = 1.0
+    recording_max_buffer_bytes: int = 4 * 1024 * 1024   # per call; beyond this data is shed
+
+    # Shared HTTP connection pool for Sarvam REST calls (LLM)
+    sarvam_http_pool_size: int = 200
+    sarvam_http_timeout: float = 30.0
+
+    # Ingress audio: ring buffer between receive() and the STT sender task
+    stt_window_ms: int = 100
+    stt_ingress_buffer_ms: int = 2000
+    stt_ingress_drop_policy: str = "oldest"  # "oldest" | "newest"
+
+    # Local VAD (energy + zero-crossing) in front of STT
+    vad_gating_enabled: bool = False      # drop silence instead of sending it to STT
+    vad_threshold_db: float = -45.0
+    vad_zcr_max: float = 0.5
+    vad_hangover_ms: int = 600            # audio kept after speech so remote VAD sees the pause
+    vad_preroll_ms: int = 200             # audio kept before onset so words are not clipped
+    vad_barge_in_ms: int = 0              # >0: local speech this long triggers barge-in
+
+    # Local endpointer: end the turn before the remote END_SPEECH
+    endpointer_enabled: bool = False
+    endpoint_silence_ms: int = 500
+    endpoint_stable_ms: int = 300
+
+    # LLM → TTS streaming: speak each sentence as soon as the LLM emits it
+    llm_streaming: bool = True
+    # Clauses shorter than this are held back and merged with the next one
+    stream_min_clause_chars: int = 24
+
+    # LLM history: token budget for the prompt; older turns are compacted into a summary
+    llm_history_max_tokens: int = 2000
+    llm_history_min_turns: int = 2        # most recent turns always kept verbatim
+    llm_summary_max_tokens: int = 300
+    llm_history_summarize: bool = True    # refine the summary with a background LLM call
+
+    # Speculative LLM: start the reply on a partial transcript that stopped changing
+    llm_speculation_enabled: bool = False
+    llm_speculation_stable_ms: int = 400
+    llm_speculation_max_per_session: int = 20
+
+    # Deadlines (0 = none). LLM: first token when streaming, else the whole reply.
+    # TTS: first audio after the text (or first streamed sentence) is sent
+    llm_timeout_ms: int = 0
+    tts_first_chunk_timeout_ms: int = 0
+    # Hedged LLM requests: a second request races the first once it is slower
+    # than this percentile of recent requests (floored at llm_hedge_min_ms)
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.9
+    llm_hedge_min_ms: int = 300
+    llm_hedge_default_ms: int = 1500      # until enough requests have been seen
+    # Played (from the TTS cache) when a turn fails before the owner heard anything
+    fallback_prompt: str = "மன்னிக்கவும், மீண்டும் ஒருமுறை சொல்ல முடியுமா?"
+
+    # Filler audio: if no reply audio has started this long after END_SPEECH,
+    # play a pre-rendered acknowledgement and crossfade into the reply
+    filler_enabled: bool = False
+    filler_delay_ms: int = 700
+    filler_crossfade_ms: int = 60
+    filler_phrases: list[str] = ["சரி, ஒரு நிமிஷம்", "ம்ம், சரி", "ஒரு நொடி"]
+
+    # Intent fast path: short, unambiguous owner replies answered without the LLM
+    intent_fast_path_enabled: bool = False
+    intent_phrases_file: str = ""        # empty = app/data/intents.json
+    intent_max_tokens: int = 4
+
+    # Barge-in: keep listening while the agent speaks; owner speech cancels TTS
+    barge_in_enabled: bool = False
+
+    # Paced egress: fixed frames on a monotonic schedule, lead_ms ahead of real time
+    egress_frame_ms: int = 20
+    egress_lead_ms: int = 120
+    egress_max_buffer_ms: int = 10000
+
+    # Segmented TTS: long utterances (e.g. the order read-out) are split at
+    # sentence / list-item boundaries and synthesised over parallel streams
+    tts_segmented_enabled: bool = False
+    tts_segment_min_text_chars: int = 160   # shorter texts use one stream
+    tts_segment_max_chars: int = 160        # longer sentences are split at clause breaks
+    tts_segment_concurrency: int = 3
+
+    # TTS audio cache (greeting and recurring phrases)
+    tts_cache_enabled: bool = True
+    tts_cache_memory_bytes: int = 64 * 1024 * 1024
+    tts_cache_disk_enabled: bool = True
+    tts_cache_dir: str = ""  # empty = <system temp>/voice_ai_tts_cache
+    tts_cache_disk_bytes: int = 1024 * 1024 * 1024
+
+    # Pooled TTS streaming connections (max_idle=0 = connect per utterance)
+    tts_pool_max_size: int = 64
+    tts_pool_max_idle: int = 16
+    tts_pool_health_check_after: float = 15.0
+    tts_pool_ping_timeout: float = 2.0
+    tts_pool_max_lifetime: float = 300.0
+    tts_pool_prewarm: int = 2            # connections opened during warm-up
+
+    # Event-loop lag probe exported on /metrics (0 disables)
+    loop_lag_interval: float = 0.25
+
+
+settings = Settings()
@@ -0,0 +1,408 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import os
+import resource
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a fast cached reply through a slow LLM turn
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+LOOP_LAG_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Stage marks recorded for every turn, in pipeline order. Each one is
+# observed as seconds since the turn started (END_SPEECH, or the accept
+# for call setup). stt_connect is only marked during call setup.
+TURN_STAGES = (
+    "stt_connect",
+    "llm_request",
+    "filler_start",
+    "llm_first_token",
+    "llm_complete",
+    "tts_connect",
+    "tts_first_chunk",
+    "first_byte_sent",
+    "turn_complete",
+)
+
+
+# -------------------------
+# Minimal Prometheus text-format metrics
+# -------------------------
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Counter that is either incremented directly or, like ``Gauge``, read at
+    scrape time by ``collect`` from totals an object already keeps.
+    """
+
+    type_name = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        # Unlabelled counters are exported as 0 before the first increment
+        self._values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.0}
+        self._collect = collect
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        values = self._collect() if self._collect is not None else self._values
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose values are either set directly or computed at scrape time
+    by ``collect`` (returning ``{label_values: value}``), so hot paths never
+    have to update it.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def render(self) -> list[str]:
+        values = self._collect() if self._collect is not None else self._values
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        # le is inclusive: first bucket whose bound is >= value
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines: list[str] = []
+        bucket_names = self.labelnames + ("le",)
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+
+        for key, (counts, total) in self._series.items():
+            for bound, cumulative in zip(bounds, itertools.accumulate(counts)):
+                labels = _format_labels(bucket_names, key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {sum(counts)}")
+        return lines
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# -------------------------
+# Process
+# -------------------------
+
+def _resident_memory() -> dict[tuple[str, ...], float]:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return {(): pages * os.sysconf("SC_PAGE_SIZE")}
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, but better than nothing off Linux
+        return {(): resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+
+def _open_fds() -> dict[tuple[str, ...], float]:
+    try:
+        return {(): len(os.listdir("/proc/self/fd"))}
+    except OSError:
+        return {}
+
+
+def _asyncio_tasks() -> dict[tuple[str, ...], float]:
+    try:
+        return {(): len(asyncio.all_tasks())}
+    except RuntimeError:
+        return {}
+
+
+# -------------------------
+# Voice pipeline metrics
+# -------------------------
+
+calls_total = Counter("voice_calls_total", "WebSocket calls accepted")
+call_startup_failures_total = Counter(
+    "voice_call_startup_failures_total",
+    "Call start-up steps that failed, by component (stt / tts / greeting)",
+    ("component",),
+)
+turns_total = Counter(
+    "voice_turns_total",
+    "Agent turns by kind (setup = greeting) and outcome",
+    ("kind", "outcome"),
+)
+intent_lookups_total = Counter(
+    "voice_intent_lookups_total",
+    "Final transcripts checked by the intent fast path, by matched intent (llm = no match)",
+    ("result",),
+)
+llm_speculations_total = Counter(
+    "voice_llm_speculations_total",
+    "Speculative LLM calls on stable partial transcripts, by outcome (used / wasted)",
+    ("outcome",),
+)
+llm_hedges_fired_total = Counter(
+    "voice_llm_hedges_fired_total",
+    "Second LLM requests started because the first was slower than the hedge budget",
+    ("kind",),
+)
+llm_hedges_won_total = Counter(
+    "voice_llm_hedges_won_total",
+    "Hedged LLM requests that answered before the original",
+    ("kind",),
+)
+deadlines_exceeded_total = Counter(
+    "voice_deadlines_exceeded_total",
+    "LLM / TTS requests abandoned at LLM_TIMEOUT_MS / TTS_FIRST_CHUNK_TIMEOUT_MS",
+    ("stage",),
+)
+fillers_played_total = Counter(
+    "voice_fillers_played_total",
+    "Filler acknowledgements played while a reply was still being generated",
+)
+fallback_prompts_total = Counter(
+    "voice_fallback_prompts_total",
+    "Turns that failed before any audio and played FALLBACK_PROMPT instead",
+)
+greeting_prerenders_total = Counter(
+    "voice_greeting_prerenders_total",
+    "Ahead-of-time greeting renders by outcome (rendered / failed / used / expired / missed)",
+    ("outcome",),
+)
+greeting_prerenders_ready = Gauge(
+    "voice_greeting_prerenders_ready",
+    "Rendered greetings waiting for their call",
+)
+greeting_prerenders_ready_bytes = Gauge(
+    "voice_greeting_prerenders_ready_bytes",
+    "PCM bytes held by rendered greetings waiting for their call",
+)
+recording_bytes_total = Counter(
+    "voice_recording_bytes_total",
+    "Bytes written to call recordings (inbound / outbound WAV incl. silence fill, events)",
+    ("stream",),
+)
+recording_dropped_bytes_total = Counter(
+    "voice_recording_dropped_bytes_total",
+    "Recording data shed because the call's buffer was full",
+    ("stream",),
+)
+recording_flush_seconds = Histogram(
+    "voice_recording_flush_seconds",
+    "Duration of one batched recording flush in the writer thread",
+    buckets=LOOP_LAG_BUCKETS + (2.5, 5.0),
+)
+turn_stage_seconds = Histogram(
+    "voice_turn_stage_seconds",
+    "Seconds from the start of a turn (END_SPEECH / call accept) to each pipeline stage",
+    ("kind", "stage"),
+)
+call_setup_seconds = Histogram(
+    "voice_call_setup_seconds",
+    "Seconds from call accept until the greeting (LLM + TTS) has been fully sent",
+)
+loop_lag_seconds = Histogram(
+    "voice_event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe",
+    buckets=LOOP_LAG_BUCKETS,
+)
+loop_lag_max_seconds = Gauge(
+    "voice_event_loop_lag_max_seconds",
+    "Worst event-loop lag seen since startup",
+)
+resident_memory_bytes = Gauge(
+    "process_resident_memory_bytes",
+    "Resident set size of this worker process",
+    collect=_resident_memory,
+)
+open_fds = Gauge(
+    "process_open_fds",
+    "File descriptors (sockets included) open in this worker process",
+    collect=_open_fds,
+)
+asyncio_tasks = Gauge(
+    "voice_asyncio_tasks",
+    "Tasks alive on this worker's event loop",
+    collect=_asyncio_tasks,
+)
+call_teardown_seconds = Histogram(
+    "voice_call_teardown_seconds",
+    "Time to cancel and unwind a call's tasks once one side has ended",
+    buckets=LOOP_LAG_BUCKETS + (2.5, 5.0),
+)
+call_leaks_total = Counter(
+    "voice_call_leaks_total",
+    "Tasks and upstream requests / sockets of ended calls still open after teardown",
+    ("resource",),
+)
+
+
+async def monitor_loop_lag(interval: float) -> None:
+    """Sleep ``interval`` repeatedly and record how late each wake-up was."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        loop_lag_seconds.observe(lag)
+        if lag > worst:
+            worst = lag
+            loop_lag_max_seconds.set(worst)
+
+
+# -------------------------
+# Per-turn timing
+# -------------------------
+
+class TurnTimer:
+    """
+    Stage timestamps for one agent turn. ``mark`` only stores a
+    ``perf_counter`` reading (first occurrence wins); everything is turned
+    into histogram observations once, in ``finish``.
+    """
+
+    __slots__ = ("kind", "started_at", "marks", "finished")
+
+    def __init__(self, kind: str = "turn") -> None:
+        self.kind = kind
+        self.started_at = time.perf_counter()
+        self.marks: dict[str, float] = {}
+        self.finished = False
+
+    def mark(self, stage: str) -> None:
+        if stage not in self.marks:
+            self.marks[stage] = time.perf_counter()
+
+    def finish(self, outcome: str = "completed") -> dict[str, int]:
+        """Record the turn; returns stage offsets in ms (empty if already finished)."""
+        if self.finished:
+            return {}
+        self.finished = True
+
+        offsets: dict[str, int] = {}
+        for stage in TURN_STAGES:
+            at = self.marks.get(stage)
+            if at is None:
+                continue
+            elapsed = at - self.started_at
+            turn_stage_seconds.observe(elapsed, kind=self.kind, stage=stage)
+            offsets[stage] = round(elapsed * 1000)
+
+        turns_total.inc(kind=self.kind, outcome=outcome)
+        if self.kind == "setup" and outcome == "completed" and "turn_complete" in self.marks:
+            call_setup_seconds.observe(self.marks["turn_complete"] - self.started_at)
+        return offsets
+
+
+# The turn being served by the current task; services mark stages on it
+# without it being threaded through every call
+current_turn: ContextVar[TurnTimer | None] = ContextVar("current_turn", default=None)
+
+
+def mark(stage: str) -> None:
+    timer = current_turn.get()
+    if timer is not None:
+        timer.mark(stage)
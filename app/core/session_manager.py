@@ -0,0 +1,340 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable
+
+from core import metrics
+from core.config import settings
+from core.state_machine import ConversationState
+
+logger = logging.getLogger(__name__)
+
+# RFC 6455 "Try Again Later": the node is saturated or draining, retry elsewhere
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class SessionRejected(Exception):
+    """Raised by ``SessionManager.admit`` when a call cannot be taken."""
+
+    def __init__(self, reason: str, code: int = CLOSE_TRY_AGAIN_LATER) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.code = code
+
+
+class Session:
+    """One live call: state, start time and the LLM / TTS time it has used."""
+
+    __slots__ = (
+        "id",
+        "client",
+        "started_at",
+        "started_monotonic",
+        "get_state",
+        "requests",
+        "busy_seconds",
+        "inflight",
+    )
+
+    def __init__(self, session_id: int, client: str) -> None:
+        self.id = session_id
+        self.client = client
+        self.started_at = time.time()
+        self.started_monotonic = time.monotonic()
+        # Bound by the call handler once its state machine exists
+        self.get_state: Callable[[], ConversationState] | None = None
+        self.requests = {"llm": 0, "tts": 0}
+        self.busy_seconds = {"llm": 0.0, "tts": 0.0}
+        # Requests holding a slot right now; non-zero after teardown is a leak
+        self.inflight = {"llm": 0, "tts": 0}
+
+    @property
+    def state(self) -> ConversationState | None:
+        return self.get_state() if self.get_state is not None else None
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "id": self.id,
+            "client": self.client,
+            "state": state.value if state is not None else None,
+            "started_at": self.started_at,
+            "duration_seconds": round(time.monotonic() - self.started_monotonic, 3),
+            "requests": dict(self.requests),
+            "inflight": dict(self.inflight),
+            "busy_seconds": {kind: round(value, 3) for kind, value in self.busy_seconds.items()},
+        }
+
+
+# Session of the call handler task; LLM / TTS slots are charged to it
+current_session: ContextVar[Session | None] = ContextVar("current_session", default=None)
+
+
+class _Limiter:
+    """In-flight request cap for one upstream (``limit`` 0 = count only)."""
+
+    def __init__(self, kind: str, limit: int) -> None:
+        self.kind = kind
+        self.limit = limit
+        self.inflight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore is not None:
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+
+        self.inflight += 1
+        session = current_session.get()
+        if session is not None:
+            session.inflight[self.kind] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+            if session is not None:
+                session.inflight[self.kind] -= 1
+                session.requests[self.kind] += 1
+                session.busy_seconds[self.kind] += time.monotonic() - started
+
+
+class SessionManager:
+    """
+    Per-process registry of live calls with admission control.
+
+    ``admit()`` takes a call if fewer than ``max_sessions`` are live (0 =
+    unlimited). Otherwise it waits up to ``queue_timeout`` seconds for a slot
+    (at most ``max_queued`` waiters) or raises ``SessionRejected``. In-flight
+    LLM and TTS requests are capped separately through ``llm_slot()`` /
+    ``tts_slot()``, so a burst of turns queues inside the process instead of
+    piling onto the upstream APIs. ``start_drain()`` stops admitting calls
+    while live ones finish.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 0,
+        queue_timeout: float = 0.0,
+        max_queued: int = 0,
+        max_llm_requests: int = 0,
+        max_tts_requests: int = 0,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.queue_timeout = queue_timeout
+        self.max_queued = max_queued
+        self.llm = _Limiter("llm", max_llm_requests)
+        self.tts = _Limiter("tts", max_tts_requests)
+
+        self._sessions: dict[int, Session] = {}
+        self._ids = itertools.count(1)
+        self._changed = asyncio.Condition()
+        self.queued = 0
+        self.draining = False
+
+    @classmethod
+    def from_settings(cls) -> "SessionManager":
+        return cls(
+            max_sessions=settings.max_concurrent_calls,
+            queue_timeout=settings.call_queue_timeout,
+            max_queued=settings.call_queue_max,
+            max_llm_requests=settings.max_inflight_llm_requests,
+            max_tts_requests=settings.max_inflight_tts_requests,
+        )
+
+    # -------------------------
+    # Admission
+    # -------------------------
+
+    def _has_room(self) -> bool:
+        return not self.max_sessions or len(self._sessions) < self.max_sessions
+
+    async def admit(self, client: str) -> Session:
+        if self.draining:
+            self._reject("draining")
+        if not self._has_room():
+            if self.queue_timeout <= 0 or self.queued >= self.max_queued:
+                self._reject("saturated")
+            await self._wait_for_room()
+
+        session = Session(next(self._ids), client)
+        self._sessions[session.id] = session
+        return session
+
+    async def _wait_for_room(self) -> None:
+        self.queued += 1
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.draining or self._has_room()),
+                    self.queue_timeout,
+                )
+        except asyncio.TimeoutError:
+            self._reject("queue timeout")
+        finally:
+            self.queued -= 1
+        if self.draining:
+            self._reject("draining")
+
+    def _reject(self, reason: str) -> None:
+        calls_rejected_total.inc(reason=reason.replace(" ", "_"))
+        logger.warning(
+            "Call rejected (%s) — %d live, limit %s",
+            reason,
+            len(self._sessions),
+            self.max_sessions or "none",
+        )
+        raise SessionRejected(reason)
+
+    def release(self, session: Session) -> None:
+        if self._sessions.pop(session.id, None) is not None:
+            self._notify()
+
+    def _notify(self) -> None:
+        async def notify() -> None:
+            async with self._changed:
+                self._changed.notify_all()
+
+        # Nothing can be waiting without a running loop
+        try:
+            asyncio.get_running_loop().create_task(notify())
+        except RuntimeError:
+            pass
+
+    # -------------------------
+    # Upstream request limits
+    # -------------------------
+
+    def llm_slot(self):
+        return self.llm.slot()
+
+    def tts_slot(self):
+        return self.tts.slot()
+
+    # -------------------------
+    # Drain
+    # -------------------------
+
+    def start_drain(self) -> None:
+        if not self.draining:
+            self.draining = True
+            logger.info("Draining — no new calls, %d live", len(self._sessions))
+            self._notify()
+
+    async def wait_drained(self, timeout: float) -> bool:
+        """Wait until no calls are live; False if ``timeout`` ran out first."""
+        try:
+            async with self._changed:
+                await asyncio.wait_for(self._changed.wait_for(lambda: not self._sessions), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    # -------------------------
+    # Registry
+    # -------------------------
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def sessions(self) -> list[Session]:
+        return list(self._sessions.values())
+
+    def snapshot(self) -> dict:
+        return {
+            "draining": self.draining,
+            "active": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "queued": self.queued,
+            "inflight": {"llm": self.llm.inflight, "tts": self.tts.inflight},
+            "waiting": {"llm": self.llm.waiting, "tts": self.tts.waiting},
+            "sessions": [session.snapshot() for session in self.sessions()],
+        }
+
+
+_manager: SessionManager | None = None
+
+
+def get_session_manager() -> SessionManager:
+    """Process-wide session manager, built from settings on first use."""
+    global _manager
+    if _manager is None:
+        _manager = SessionManager.from_settings()
+    return _manager
+
+
+# -------------------------
+# Metrics (read at scrape time only)
+# -------------------------
+
+def _active_sessions() -> dict[tuple[str, ...], float]:
+    return {(): len(get_session_manager())}
+
+
+def _sessions_by_state() -> dict[tuple[str, ...], float]:
+    counts = {(state.value,): 0 for state in ConversationState}
+    for session in get_session_manager().sessions():
+        state = session.state
+        if state is not None:
+            counts[(state.value,)] += 1
+    return counts
+
+
+def _inflight_requests() -> dict[tuple[str, ...], float]:
+    manager = get_session_manager()
+    return {(limiter.kind,): limiter.inflight for limiter in (manager.llm, manager.tts)}
+
+
+def _waiting_requests() -> dict[tuple[str, ...], float]:
+    manager = get_session_manager()
+    return {(limiter.kind,): limiter.waiting for limiter in (manager.llm, manager.tts)}
+
+
+active_sessions = metrics.Gauge(
+    "voice_active_sessions",
+    "WebSocket voice sessions currently open",
+    collect=_active_sessions,
+)
+sessions_by_state = metrics.Gauge(
+    "voice_sessions_by_state",
+    "Open sessions per ConversationState",
+    ("state",),
+    collect=_sessions_by_state,
+)
+calls_rejected_total = metrics.Counter(
+    "voice_calls_rejected_total",
+    "Calls refused by admission control (saturated / queue_timeout / draining)",
+    ("reason",),
+)
+call_queue_length = metrics.Gauge(
+    "voice_call_queue_length",
+    "Calls waiting for a free session slot",
+    collect=lambda: {(): get_session_manager().queued},
+)
+inflight_requests = metrics.Gauge(
+    "voice_inflight_requests",
+    "LLM / TTS requests currently running against the upstream APIs",
+    ("kind",),
+    collect=_inflight_requests,
+)
+waiting_requests = metrics.Gauge(
+    "voice_waiting_requests",
+    "LLM / TTS requests waiting for a slot under MAX_INFLIGHT_*_REQUESTS",
+    ("kind",),
+    collect=_waiting_requests,
+)
+draining = metrics.Gauge(
+    "voice_draining",
+    "1 while the process is draining (not admitting calls)",
+    collect=lambda: {(): int(get_session_manager().draining)},
+)
@@ -1,11 +1,25 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 load_dotenv()
 
+from core.config import settings
+from core.metrics import monitor_loop_lag, render_metrics
+from core.session_manager import get_session_manager
+from services.call_recorder import get_recording_writer
+from services.clients import ServiceClients
+from services.filler import get_filler_bank
+from services.greeting_prerender import prerenderer_from_settings
+from services.intent_classifier import get_intent_classifier
+from services.order_feed import order_feed_from_settings
+from services.tts_service import SarvamTTSService
+from services.warmup import WarmUp, preimport, prime_http
 from websocket.call_handler import router as ws_router
 
 logging.basicConfig(
@@ -13,12 +27,124 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One set of Sarvam clients / HTTP pool / TTS pool per process
+    app.state.clients = ServiceClients.from_env()
+    background: list[asyncio.Task] = []
+    if settings.loop_lag_interval > 0:
+        background.append(asyncio.create_task(monitor_loop_lag(settings.loop_lag_interval)))
+
+    # Fast-path replies and the fallback prompt should already be in the TTS
+    # cache on their first use
+    clients = app.state.clients
+    intents = get_intent_classifier()
+    phrases = intents.responses() if intents is not None else []
+    if settings.fallback_prompt:
+        phrases.append(settings.fallback_prompt)
+    tts = SarvamTTSService(clients.tts_pool, clients.tts_cache)
+
+    # /readyz stays 503 until imports, connections and cached audio are warm
+    steps = {
+        "imports": preimport(),
+        "http": prime_http(clients),
+        "tts_pool": clients.tts_pool.prewarm(settings.tts_pool_prewarm),
+    }
+    if phrases:
+        steps["tts_cache"] = tts.presynthesize(phrases)
+    fillers = get_filler_bank()
+    if fillers is not None:
+        steps["fillers"] = fillers.load(tts)
+    app.state.warmup = WarmUp()
+    background.append(asyncio.create_task(app.state.warmup.run(steps, settings.warmup_timeout)))
+
+    recording = get_recording_writer()
+    if recording is not None:
+        background.append(asyncio.create_task(recording.run()))
+
+    # Orders arriving on the feed get their greeting rendered before the call
+    feed = order_feed_from_settings()
+    app.state.greetings = None
+    if feed is not None:
+        app.state.greetings = prerenderer_from_settings(app.state.clients)
+        background.append(asyncio.create_task(app.state.greetings.run(feed)))
+
+    try:
+        yield
+    finally:
+        # Late for a graceful drain (uvicorn has closed the sockets by now), but
+        # keeps anything still running from admitting calls; see /admin/drain
+        # and serve.py, which drains before closing
+        get_session_manager().start_drain()
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        if feed is not None:
+            await feed.aclose()
+        await app.state.clients.aclose()
+
+
 app = FastAPI(
     title="Voice AI — Audio Stream Server",
     version="0.2.0",
+    lifespan=lifespan,
 )
 
 app.include_router(ws_router)
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of turn latency, call and session metrics."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/healthz")
+async def healthz() -> dict:
+    """Liveness: the worker's event loop is serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz() -> JSONResponse:
+    """
+    Readiness: 200 once warm-up has finished and the worker is not draining,
+    503 otherwise, so the load balancer only routes calls to warm workers.
+    """
+    warmup = app.state.warmup
+    sessions = get_session_manager()
+    ready = warmup.done and not sessions.draining
+    body = {"ready": ready, "draining": sessions.draining, "warmup": warmup.steps}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+def _require_local(request: Request) -> None:
+    # Operator endpoints: only reachable from the node itself (preStop hook, curl)
+    if request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+        raise HTTPException(status_code=403, detail="admin endpoints are local only")
+
+
+@app.get("/admin/sessions")
+async def list_sessions(request: Request) -> dict:
+    """Live calls with state, start time and LLM / TTS usage, plus admission state."""
+    _require_local(request)
+    return get_session_manager().snapshot()
+
+
+@app.post("/admin/drain")
+async def drain(request: Request, timeout: float | None = None) -> dict:
+    """
+    Stop admitting calls (new ones get close code 1013) and wait up to
+    ``timeout`` (default DRAIN_TIMEOUT) seconds for live calls to finish.
+    Run before stopping the process so in-flight calls are not cut off.
+    """
+    _require_local(request)
+    sessions = get_session_manager()
+    sessions.start_drain()
+    drained = await sessions.wait_drained(settings.drain_timeout if timeout is None else timeout)
+    return {"draining": True, "drained": drained, "active": len(sessions)}
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
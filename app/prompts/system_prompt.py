@@ -8,3 +8,15 @@ SYSTEM_PROMPT = (
     "- Output your response ONLY as a JSON object with two keys: 'response' (the Tamil text to speak) and 'end_conversation' (boolean, true if the call should end, false otherwise).\n"
     "- Do not include any markdown formatting like ```json ... ```, just pure JSON.\n"
 )
+
+HISTORY_SUMMARY_PROMPT = (
+    "You maintain a running summary of a phone call in which an assistant confirms a food delivery "
+    "order with a restaurant owner.\n\n"
+
+    "You are given the current summary and the exchanges that happened since it was written.\n"
+    "- Update the summary to cover everything.\n"
+    "- 'confirmed': short facts the owner has confirmed or decided (items, quantities, timings, changes).\n"
+    "- 'open_questions': things still unanswered or unresolved.\n"
+    "- Keep each entry under 15 words, in the language used in the call.\n"
+    "- Output ONLY a JSON object with the keys 'confirmed' and 'open_questions' (lists of strings), no markdown.\n"
+)
@@ -0,0 +1,118 @@
+"""
+Production entrypoint: ``python serve.py`` (from app/).
+
+Starts SERVER_WORKERS uvicorn workers (0 = one per CPU core). Each worker
+binds its own listening socket on SERVER_HOST:SERVER_PORT with
+SO_REUSEPORT, so the kernel spreads new connections across them and a
+stalled event loop only holds up the calls it already has. ``main`` is
+imported before the workers fork, so they start with it loaded.
+
+SIGTERM drains every worker: it closes its listening socket, so new calls
+land on the workers still running, and gives calls in progress up to
+DRAIN_TIMEOUT seconds to finish before it exits. The supervisor restarts
+workers that die on their own.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+import main  # noqa: F401 — loaded once here, inherited by every worker
+from core.config import settings
+from core.session_manager import get_session_manager
+
+logger = logging.getLogger("serve")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    return sock
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that stops listening first, so new calls go to the other
+    workers on the port, then drains its live calls before shutting down.
+    """
+
+    async def shutdown(self, sockets=None) -> None:
+        # Closing the listeners leaves open connections alone; the kernel
+        # hands new ones to the sibling sockets in the SO_REUSEPORT group
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+        sessions = get_session_manager()
+        sessions.start_drain()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.drain_timeout
+        # A second SIGTERM / Ctrl-C (force_exit) stops waiting
+        while len(sessions) and not self.force_exit and loop.time() < deadline:
+            await sessions.wait_drained(min(1.0, deadline - loop.time()))
+        if len(sessions):
+            logger.warning("Worker %d shutting down with %d calls live", os.getpid(), len(sessions))
+        await super().shutdown(sockets=sockets)
+
+
+def _run_worker(host: str, port: int) -> None:
+    sock = _bind(host, port)
+    config = uvicorn.Config("main:app", access_log=False, log_config=None)
+    DrainingServer(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int) -> None:
+    def start() -> multiprocessing.Process:
+        process = multiprocessing.Process(target=_run_worker, args=(host, port), daemon=False)
+        process.start()
+        return process
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        # Ctrl-C already reached the workers through the process group
+        if signum != signal.SIGINT:
+            for process in processes:
+                if process.is_alive():
+                    os.kill(process.pid, signum)
+
+    processes = [start() for _ in range(workers)]
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Serving on %s:%d with %d workers (SO_REUSEPORT)", host, port, workers)
+
+    while True:
+        time.sleep(0.5)
+        if stopping:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        for i, process in enumerate(processes):
+            if process.exitcode is not None:
+                logger.error("Worker %d exited with %s — restarting", process.pid, process.exitcode)
+                processes[i] = start()
+
+    for process in processes:
+        process.join()
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("serve.py needs SO_REUSEPORT (Linux / BSD); use `python main.py` instead")
+    serve(
+        settings.server_host,
+        settings.server_port,
+        settings.server_workers or os.cpu_count() or 1,
+    )
@@ -0,0 +1,268 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Internal pipeline format: what STT expects and TTS produces
+PIPELINE_SAMPLE_RATE = 16000
+
+CODEC_PCM16 = "pcm16"
+CODEC_MULAW = "mulaw"
+CODEC_ALAW = "alaw"
+
+SUPPORTED_CODECS = (CODEC_PCM16, CODEC_MULAW, CODEC_ALAW)
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 44100, 48000)
+
+
+class AudioFormatError(ValueError):
+    """Raised when a client requests an unsupported codec or sample rate."""
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    codec: str = CODEC_PCM16
+    sample_rate: int = PIPELINE_SAMPLE_RATE
+
+    @property
+    def bytes_per_sample(self) -> int:
+        return 2 if self.codec == CODEC_PCM16 else 1
+
+    @property
+    def is_pipeline_native(self) -> bool:
+        return self.codec == CODEC_PCM16 and self.sample_rate == PIPELINE_SAMPLE_RATE
+
+    @classmethod
+    def from_query(cls, params) -> "AudioFormat":
+        """
+        Negotiate the client format from connection query parameters,
+        e.g. ``/ws/audio?codec=mulaw&sample_rate=8000``. Defaults to the
+        browser tester's 16 kHz PCM.
+        """
+        codec = params.get("codec", CODEC_PCM16).lower()
+        if codec in ("ulaw", "pcmu", "g711u"):
+            codec = CODEC_MULAW
+        elif codec in ("pcma", "g711a"):
+            codec = CODEC_ALAW
+
+        try:
+            default_rate = 8000 if codec != CODEC_PCM16 else PIPELINE_SAMPLE_RATE
+            sample_rate = int(params.get("sample_rate", default_rate))
+        except ValueError:
+            raise AudioFormatError(f"Invalid sample_rate: {params.get('sample_rate')}")
+
+        if codec not in SUPPORTED_CODECS:
+            raise AudioFormatError(f"Unsupported codec: {codec}")
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise AudioFormatError(f"Unsupported sample rate: {sample_rate}")
+        return cls(codec=codec, sample_rate=sample_rate)
+
+
+# -------------------------
+# G.711 (vectorized, table driven)
+# -------------------------
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = ((mantissa << 3) + 0x84) << exponent
+    sample = magnitude - 0x84
+    return np.where(codes & 0x80, -sample, sample).astype(np.int16)
+
+
+def _build_alaw_decode_table() -> np.ndarray:
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (mantissa << 4) + 8
+    magnitude = np.where(
+        exponent == 0,
+        magnitude,
+        (magnitude + 0x100) << np.maximum(exponent - 1, 0),
+    )
+    return np.where(codes & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+_ULAW_DECODE = _build_ulaw_decode_table()
+_ALAW_DECODE = _build_alaw_decode_table()
+_ULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEGMENT_ENDS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+def ulaw_decode(data: bytes) -> np.ndarray:
+    return _ULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def alaw_decode(data: bytes) -> np.ndarray:
+    return _ALAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def ulaw_encode(samples: np.ndarray) -> bytes:
+    # Reference G.711 (14-bit) algorithm, bit-exact with audioop.lin2ulaw
+    x = samples.astype(np.int32) >> 2
+    negative = x < 0
+    mask = np.where(negative, 0x7F, 0xFF)
+    x = np.minimum(np.where(negative, -x, x), 8159) + 0x21
+
+    segment = np.searchsorted(_ULAW_SEGMENT_ENDS, x)
+    code = (np.minimum(segment, 7) << 4) | ((x >> (segment + 1)) & 0x0F)
+    code = np.where(segment >= 8, 0x7F, code)
+    return ((code ^ mask) & 0xFF).astype(np.uint8).tobytes()
+
+
+def alaw_encode(samples: np.ndarray) -> bytes:
+    x = samples.astype(np.int32) >> 3
+    negative = x < 0
+    mask = np.where(negative, 0x55, 0xD5)
+    x = np.where(negative, -x - 1, x)
+
+    segment = np.searchsorted(_ALAW_SEGMENT_ENDS, x)
+    shift = np.where(segment < 2, 1, segment)
+    code = (np.minimum(segment, 7) << 4) | ((x >> shift) & 0x0F)
+    code = np.where(segment >= 8, 0x7F, code)
+    return ((code ^ mask) & 0xFF).astype(np.uint8).tobytes()
+
+
+# -------------------------
+# Resampling
+# -------------------------
+
+def _lowpass_kernel(cutoff: float, taps: int = 31) -> np.ndarray:
+    """Hann-windowed sinc; ``cutoff`` is a fraction of the input sample rate."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff * n) * np.hanning(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+class StreamResampler:
+    """
+    Chunk-by-chunk resampler that keeps filter history and fractional phase
+    between calls, so frame boundaries do not click. Downsampling applies a
+    windowed-sinc anti-alias filter before linear interpolation.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps: int = 31) -> None:
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate
+
+        self._kernel = None
+        self._history = np.zeros(0, dtype=np.float32)
+        if dst_rate < src_rate:
+            self._kernel = _lowpass_kernel(0.5 * dst_rate / src_rate * 0.9, taps)
+            self._history = np.zeros(taps - 1, dtype=np.float32)
+
+        self._last = 0.0   # final filtered sample of the previous chunk
+        self._pos = 0.0    # next output position, relative to the current chunk
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.src_rate == self.dst_rate:
+            return samples.astype(np.int16, copy=False)
+        if samples.size == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        x = samples.astype(np.float32)
+        if self._kernel is not None:
+            padded = np.concatenate((self._history, x))
+            self._history = padded[-(self._kernel.size - 1):]
+            x = np.convolve(padded, self._kernel, mode="valid")
+
+        # buffer[0] is the previous chunk's last sample (position -1)
+        buffer = np.concatenate(([self._last], x))
+        positions = np.arange(self._pos, x.size - 1 + 1e-9, self.step)
+        out = np.interp(positions + 1, np.arange(buffer.size), buffer)
+
+        if positions.size:
+            self._pos = positions[-1] + self.step - x.size
+        else:
+            self._pos -= x.size
+        self._last = float(x[-1])
+
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+# -------------------------
+# Per-connection transcoders
+# -------------------------
+
+class IngressTranscoder:
+    """Client audio → 16 kHz 16-bit PCM bytes for VAD/STT."""
+
+    def __init__(self, fmt: AudioFormat) -> None:
+        self.format = fmt
+        self._resampler = StreamResampler(fmt.sample_rate, PIPELINE_SAMPLE_RATE)
+        self._carry = b""
+
+    def process(self, data: bytes) -> bytes:
+        if self.format.is_pipeline_native:
+            return data
+
+        if self.format.codec == CODEC_MULAW:
+            samples = ulaw_decode(data)
+        elif self.format.codec == CODEC_ALAW:
+            samples = alaw_decode(data)
+        else:
+            # Keep 16-bit alignment across odd-length frames
+            data = self._carry + data
+            usable = len(data) & ~1
+            self._carry = data[usable:]
+            samples = np.frombuffer(data, dtype="<i2", count=usable // 2)
+
+        return self._resampler.process(samples).astype("<i2", copy=False).tobytes()
+
+
+class EgressTranscoder:
+    """16 kHz 16-bit PCM from TTS → client codec / sample rate."""
+
+    def __init__(self, fmt: AudioFormat) -> None:
+        self.format = fmt
+        self._resampler = StreamResampler(PIPELINE_SAMPLE_RATE, fmt.sample_rate)
+        self._carry = b""
+
+    def process(self, pcm: bytes) -> bytes:
+        if self.format.is_pipeline_native:
+            return pcm
+
+        data = self._carry + pcm
+        usable = len(data) & ~1
+        self._carry = data[usable:]
+        samples = self._resampler.process(
+            np.frombuffer(data, dtype="<i2", count=usable // 2)
+        )
+
+        if self.format.codec == CODEC_MULAW:
+            return ulaw_encode(samples)
+        if self.format.codec == CODEC_ALAW:
+            return alaw_encode(samples)
+        return samples.astype("<i2", copy=False).tobytes()
+
+
+class ClientAudioSink:
+    """
+    Drop-in for ``websocket`` in the TTS path: ``send_bytes`` takes pipeline
+    PCM and sends it in the client's negotiated format.
+    """
+
+    def __init__(self, websocket, fmt: AudioFormat) -> None:
+        self._websocket = websocket
+        self._transcoder = EgressTranscoder(fmt)
+
+    async def send_bytes(self, pcm: bytes) -> None:
+        encoded = self._transcoder.process(pcm)
+        if encoded:
+            await self._websocket.send_bytes(encoded)
+
+
+def sine_tone(
+    frequency: float,
+    duration: float,
+    sample_rate: int = PIPELINE_SAMPLE_RATE,
+    amplitude: int = 3000,
+) -> bytes:
+    """16-bit mono sine wave, generated in one vectorized pass."""
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    # int() in the old loop truncated toward zero; keep that exactly
+    samples = np.trunc(amplitude * np.sin(2.0 * np.pi * frequency * t))
+    return samples.astype("<i2").tobytes()
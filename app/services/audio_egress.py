@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EgressClosed(Exception):
+    """The client socket is gone; nothing more can be played on this call."""
+
+
+class AudioEgress:
+    """
+    Per-session paced audio output.
+
+    TTS readers ``write`` PCM into a bounded jitter buffer and return
+    immediately; a single writer task sends fixed ``frame_ms`` frames on an
+    absolute monotonic-clock schedule (frame *n* is due at
+    ``start + n * frame - lead``), so sleep overshoot and send time never
+    accumulate into drift. ``lead_ms`` is how far ahead of real time the
+    client is kept, i.e. its playback cushion.
+
+    ``clear`` drops everything queued (barge-in / cancellation); ``drain``
+    waits until the current utterance has been fully sent.
+
+    ``play_filler`` queues a placeholder (e.g. "சரி, ஒரு நிமிஷம்") while a
+    reply is being generated. The next ``write`` replaces whatever of it is
+    still unsent with a ``crossfade_ms`` fade into the reply.
+
+    A failed send means the client has gone: the writer stops, queued audio
+    is dropped, ``write`` and ``drain`` raise ``EgressClosed`` from then on
+    and ``wait_closed`` returns, so the call can tear down.
+    """
+
+    def __init__(
+        self,
+        sink,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        lead_ms: int = 120,
+        max_buffer_ms: int = 10000,
+        tap: Callable[[bytes], None] | None = None,
+        crossfade_ms: int = 60,
+    ) -> None:
+        self._sink = sink
+        # Sees every frame actually sent (call recording); must not block
+        self._tap = tap
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.frame_bytes = int(self.bytes_per_ms * frame_ms) & ~1
+        self.frame_duration = frame_ms / 1000
+        self.lead = lead_ms / 1000
+        self.max_bytes = max(int(self.bytes_per_ms * max_buffer_ms) & ~1, self.frame_bytes)
+        self.crossfade_bytes = int(self.bytes_per_ms * crossfade_ms) & ~1
+
+        self._buf = bytearray()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._end_of_utterance = False
+        # Filler audio at the head of _buf, not yet sent
+        self._filler_bytes = 0
+
+        self._clock_start: float | None = None
+        self._frames_scheduled = 0
+        self._task: asyncio.Task | None = None
+        self._on_next_send: Callable[[], None] | None = None
+        self._closed = asyncio.Event()
+
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.underruns = 0
+        self.late_frames = 0
+        self.bytes_cleared = 0
+        self.fillers = 0
+        self.filler_bytes_cut = 0
+        self.max_depth_bytes = 0
+        self.first_send_at: float | None = None
+
+    @property
+    def depth_ms(self) -> float:
+        return len(self._buf) / self.bytes_per_ms
+
+    @property
+    def is_idle(self) -> bool:
+        return self._idle.is_set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Egress stats: %s", self.stats())
+
+    async def wait_closed(self) -> None:
+        """Return once a send has failed and the writer has stopped."""
+        await self._closed.wait()
+
+    def on_next_send(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once, right after the next frame reaches the sink."""
+        self._on_next_send = callback
+
+    def play_filler(self, pcm: bytes) -> bool:
+        """Queue filler audio if nothing else is playing; False if the egress is busy."""
+        if not self.is_idle or self.closed or not pcm:
+            return False
+        # Whole frames only, so none of it waits for the next write
+        pcm = pcm + bytes(-len(pcm) % self.frame_bytes)
+        self._buf += pcm[:self.max_bytes]
+        self._filler_bytes = len(self._buf)
+        self.fillers += 1
+        # Nothing follows unless a reply is written; let the writer go idle after it
+        self._end_of_utterance = True
+        self._idle.clear()
+        self._readable.set()
+        return True
+
+    def _crossfade(self, pcm: memoryview) -> bytes:
+        """The start of ``pcm`` mixed over the unsent filler, which is dropped."""
+        fade = min(self._filler_bytes, len(pcm), self.crossfade_bytes) & ~1
+        filler = np.frombuffer(self._buf, dtype="<i2", count=fade // 2).astype(np.float32)
+        reply = np.frombuffer(pcm[:fade], dtype="<i2").astype(np.float32)
+        ramp = np.linspace(0.0, 1.0, fade // 2, dtype=np.float32)
+        mixed = (filler * (1.0 - ramp) + reply * ramp).astype("<i2").tobytes()
+
+        self.filler_bytes_cut += self._filler_bytes - fade
+        del self._buf[:self._filler_bytes]
+        self._filler_bytes = 0
+        self._writable.set()
+        return mixed + bytes(pcm[fade:])
+
+    async def write(self, pcm: bytes | memoryview) -> None:
+        """Queue PCM for playback; waits only while the jitter buffer is full."""
+        if self.closed:
+            raise EgressClosed("client socket closed")
+        view = memoryview(pcm)
+        if self._filler_bytes:
+            view = memoryview(self._crossfade(view))
+        self._end_of_utterance = False
+        offset = 0
+
+        while offset < len(view):
+            space = self.max_bytes - len(self._buf)
+            if space <= 0:
+                self._writable.clear()
+                await self._writable.wait()
+                if self.closed:
+                    raise EgressClosed("client socket closed")
+                continue
+
+            piece = view[offset:offset + space]
+            self._buf += piece
+            offset += len(piece)
+
+            self._idle.clear()
+            self._readable.set()
+            self.max_depth_bytes = max(self.max_depth_bytes, len(self._buf))
+
+    async def drain(self) -> None:
+        """Mark the end of the utterance and wait until it has all been sent."""
+        self._end_of_utterance = True
+        self._readable.set()
+        await self._idle.wait()
+        if self.closed:
+            raise EgressClosed("client socket closed")
+
+    def clear(self) -> int:
+        """Drop all queued audio immediately. Returns the number of bytes dropped."""
+        dropped = len(self._buf)
+        self._buf.clear()
+        self._filler_bytes = 0
+        self.bytes_cleared += dropped
+        self._clock_start = None
+        self._writable.set()
+        self._idle.set()
+        if dropped:
+            logger.info("Egress cleared — dropped %.0f ms of queued audio", dropped / self.bytes_per_ms)
+        return dropped
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "underruns": self.underruns,
+            "late_frames": self.late_frames,
+            "depth_ms": round(self.depth_ms, 1),
+            "max_depth_ms": round(self.max_depth_bytes / self.bytes_per_ms, 1),
+            "cleared_ms": round(self.bytes_cleared / self.bytes_per_ms, 1),
+            "fillers": self.fillers,
+            "filler_cut_ms": round(self.filler_bytes_cut / self.bytes_per_ms, 1),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            if len(self._buf) < self.frame_bytes and not (self._end_of_utterance and self._buf):
+                if not self._buf and (self._end_of_utterance or self._clock_start is None):
+                    # Utterance finished (or nothing playing): next write re-anchors the clock
+                    self._clock_start = None
+                    self._idle.set()
+
+                self._readable.clear()
+                await self._readable.wait()
+                continue
+
+            now = time.monotonic()
+            if self._clock_start is None:
+                self._clock_start = now
+                self._frames_scheduled = 0
+            else:
+                due = self._clock_start + self._frames_scheduled * self.frame_duration
+                if now > due:
+                    # Client has played everything we sent — it starved; re-anchor
+                    self.underruns += 1
+                    logger.debug("Egress underrun — %.0f ms late", (now - due) * 1000)
+                    self._clock_start = now
+                    self._frames_scheduled = 0
+
+            deadline = (
+                self._clock_start
+                + self._frames_scheduled * self.frame_duration
+                - self.lead
+            )
+            delay = deadline - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                if not self._buf:
+                    # Cleared while we were waiting
+                    continue
+            elif (
+                delay < -self.frame_duration
+                and self._frames_scheduled * self.frame_duration >= self.lead
+            ):
+                # Past the initial lead burst and eating into the client's cushion
+                self.late_frames += 1
+
+            frame = bytes(self._buf[:self.frame_bytes])
+            del self._buf[:self.frame_bytes]
+            self._writable.set()
+            filler = min(self._filler_bytes, len(frame))
+            self._filler_bytes -= filler
+
+            try:
+                await self._sink.send_bytes(frame)
+            except Exception as e:
+                # The socket does not come back; stop pacing frames nobody can receive
+                logger.warning("Egress send failed — client gone, stopping playback: %s", e)
+                self._closed.set()
+                self.clear()
+                return
+
+            if self._tap is not None:
+                self._tap(frame)
+            if self.first_send_at is None:
+                self.first_send_at = time.monotonic()
+            if self._on_next_send is not None and filler < len(frame):
+                # Filler frames do not count as the reply reaching the client
+                callback, self._on_next_send = self._on_next_send, None
+                callback()
+            self._frames_scheduled += 1
+            self.frames_sent += 1
+            self.bytes_sent += len(frame)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "oldest"
+DROP_NEWEST = "newest"
+
+
+class AudioIngressBuffer:
+    """
+    Bounded per-session ring buffer between ``websocket.receive()`` and STT.
+
+    The receive loop only ever calls ``push`` (never blocks, never awaits the
+    STT socket). A separate sender task calls ``read_window`` to pull
+    coalesced windows of ``window_bytes``; a partial window is released
+    after ``max_wait`` seconds so trailing speech is never stuck.
+
+    On overflow either the oldest buffered audio is overwritten
+    (``drop_policy="oldest"``, keeps latency bounded) or the incoming frame is
+    discarded (``"newest"``).
+    """
+
+    def __init__(
+        self,
+        capacity_bytes: int,
+        window_bytes: int,
+        max_wait: float,
+        drop_policy: str = DROP_OLDEST,
+    ) -> None:
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        # Keep everything 16-bit aligned
+        self.capacity = max(capacity_bytes, window_bytes) & ~1
+        self.window_bytes = window_bytes & ~1
+        self.max_wait = max_wait
+        self.drop_policy = drop_policy
+
+        self._buf = bytearray(self.capacity)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._data_ready = asyncio.Event()
+
+        self.frames_in = 0
+        self.bytes_in = 0
+        self.frames_dropped = 0
+        self.bytes_dropped = 0
+        self.windows_out = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def push(self, data: bytes) -> None:
+        if self._closed:
+            return
+
+        self.frames_in += 1
+        self.bytes_in += len(data)
+        view = memoryview(data)
+
+        if len(view) > self.capacity:
+            # Frame larger than the whole ring — keep only its tail
+            excess = len(view) - self.capacity
+            self._count_drop(excess)
+            view = view[excess:]
+
+        free = self.capacity - self._size
+        if len(view) > free:
+            if self.drop_policy == DROP_NEWEST:
+                self._count_drop(len(view))
+                return
+            overflow = len(view) - free
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            self._count_drop(overflow)
+
+        end = (self._start + self._size) % self.capacity
+        first = min(len(view), self.capacity - end)
+        self._buf[end:end + first] = view[:first]
+        if first < len(view):
+            self._buf[:len(view) - first] = view[first:]
+        self._size += len(view)
+
+        if self._size >= self.window_bytes:
+            self._data_ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._data_ready.set()
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+        self._data_ready.clear()
+
+    async def read_window(self, out: memoryview) -> int:
+        """
+        Wait for a full window (or ``max_wait`` / close with partial data) and
+        copy it into ``out``. Returns the number of bytes written; 0 means the
+        buffer is closed and drained.
+        """
+        while self._size < self.window_bytes and not self._closed:
+            self._data_ready.clear()
+            try:
+                await asyncio.wait_for(self._data_ready.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                # A lone odd byte waits for the rest of its sample, so 0 is
+                # only ever returned once the buffer is closed
+                if self._size >= 2:
+                    break
+
+        count = min(self._size, self.window_bytes, len(out)) & ~1
+        if count == 0:
+            return 0
+
+        first = min(count, self.capacity - self._start)
+        out[:first] = self._buf[self._start:self._start + first]
+        if first < count:
+            out[first:count] = self._buf[:count - first]
+
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+        self.windows_out += 1
+        return count
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "frames_in": self.frames_in,
+            "bytes_in": self.bytes_in,
+            "frames_dropped": self.frames_dropped,
+            "bytes_dropped": self.bytes_dropped,
+            "windows_out": self.windows_out,
+            "buffered_bytes": self._size,
+        }
+
+    def _count_drop(self, nbytes: int) -> None:
+        if self.frames_dropped == 0:
+            logger.warning("Ingress audio buffer overflow — dropping %s audio", self.drop_policy)
+        self.frames_dropped += 1
+        self.bytes_dropped += nbytes
@@ -0,0 +1,264 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from core import metrics
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+# Wall-clock gaps longer than this are filled with silence so both WAV
+# files stay aligned with the call timeline
+GAP_FILL_BYTES = BYTES_PER_SECOND // 10
+
+
+class _AudioStream:
+    """Pending PCM of one direction; silence padding is computed here, written later."""
+
+    __slots__ = ("name", "pending", "cursor")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # (silence bytes to write first, pcm)
+        self.pending: list[tuple[int, bytes]] = []
+        # Bytes of the file timeline already accounted for
+        self.cursor = 0
+
+
+class CallRecorder:
+    """
+    Per-call recording: caller audio, agent audio (as sent) and turn events.
+
+    The ``inbound`` / ``outbound`` / ``event`` methods only append to
+    in-memory lists and never wait; ``RecordingWriter`` swaps the lists out
+    and writes them to ``inbound.wav``, ``outbound.wav`` and
+    ``events.jsonl`` in a worker thread. Once more than ``max_buffer_bytes``
+    are waiting (disk not keeping up), new data is dropped and counted.
+    """
+
+    def __init__(self, call_id: str, directory: Path, max_buffer_bytes: int) -> None:
+        self.call_id = call_id
+        self.directory = directory
+        self.max_buffer_bytes = max_buffer_bytes
+        self.started = time.monotonic()
+
+        self._audio = {name: _AudioStream(name) for name in ("inbound", "outbound")}
+        self._events: list[str] = []
+        self._buffered = 0
+        self.dropped_bytes = 0
+        self.closed = False
+
+    def inbound(self, pcm: bytes) -> None:
+        self._append_audio("inbound", pcm)
+
+    def outbound(self, pcm: bytes) -> None:
+        self._append_audio("outbound", pcm)
+
+    def event(self, kind: str, **data) -> None:
+        line = json.dumps(
+            {"t": round(time.monotonic() - self.started, 3), "event": kind, **data},
+            ensure_ascii=False,
+        )
+        if self._admit(len(line), "events"):
+            self._events.append(line)
+
+    def close(self) -> None:
+        """No more data; the writer finalises the files on its next flush."""
+        self.closed = True
+
+    def _append_audio(self, name: str, pcm: bytes) -> None:
+        if self.closed or not pcm or not self._admit(len(pcm), name):
+            return
+        stream = self._audio[name]
+        expected = int((time.monotonic() - self.started) * BYTES_PER_SECOND) & ~1
+        gap = expected - stream.cursor - len(pcm)
+        pad = gap if gap > GAP_FILL_BYTES else 0
+        stream.pending.append((pad, bytes(pcm)))
+        stream.cursor += pad + len(pcm)
+
+    def _admit(self, size: int, stream: str) -> bool:
+        if self._buffered + size > self.max_buffer_bytes:
+            self.dropped_bytes += size
+            metrics.recording_dropped_bytes_total.inc(size, stream=stream)
+            return False
+        self._buffered += size
+        return True
+
+    def take_batch(self) -> dict:
+        """Swap out everything buffered (called by the writer on the event loop)."""
+        batch = {
+            "audio": {},
+            "events": self._events,
+            "closed": self.closed,
+        }
+        for name, stream in self._audio.items():
+            batch["audio"][name], stream.pending = stream.pending, []
+        self._events = []
+        self._buffered = 0
+        return batch
+
+
+class _Files:
+    """Open WAV / JSONL handles of one recording; only touched by the writer thread."""
+
+    def __init__(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.wavs: dict[str, wave.Wave_write] = {}
+        for name in ("inbound", "outbound"):
+            wav = wave.open(str(directory / f"{name}.wav"), "wb")
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            self.wavs[name] = wav
+        self.events = open(directory / "events.jsonl", "a", encoding="utf-8")
+
+    def write(self, batch: dict) -> dict[str, int]:
+        written: dict[str, int] = {}
+        for name, chunks in batch["audio"].items():
+            wav = self.wavs[name]
+            for pad, pcm in chunks:
+                if pad:
+                    wav.writeframesraw(bytes(pad))
+                wav.writeframesraw(pcm)
+                written[name] = written.get(name, 0) + pad + len(pcm)
+        if batch["events"]:
+            text = "\n".join(batch["events"]) + "\n"
+            self.events.write(text)
+            written["events"] = len(text)
+        return written
+
+    def close(self) -> None:
+        # Wave_write.close() patches the RIFF / data sizes in the header. Every
+        # handle is closed even if an earlier one raises
+        with contextlib.ExitStack() as stack:
+            stack.callback(self.events.close)
+            for wav in self.wavs.values():
+                stack.callback(wav.close)
+
+
+class RecordingWriter:
+    """
+    Process-wide background writer for all ``CallRecorder`` instances.
+
+    Every ``flush_interval`` seconds it swaps out each recorder's buffers on
+    the event loop (O(1) per call) and hands the whole batch to one
+    ``asyncio.to_thread`` call, so file I/O never runs on the loop and the
+    loop cost does not grow with the bytes recorded.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        flush_interval: float = 1.0,
+        max_buffer_bytes: int = 4 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+        self._recorders: dict[str, CallRecorder] = {}
+        # call_id → open files; owned by the writer thread
+        self._files: dict[str, _Files] = {}
+        # Thread job of the current flush; never two at once
+        self._inflight: asyncio.Future | None = None
+
+    def open(self, call_id: str) -> CallRecorder:
+        recorder = CallRecorder(call_id, self.directory / call_id, self.max_buffer_bytes)
+        self._recorders[call_id] = recorder
+        return recorder
+
+    async def run(self) -> None:
+        logger.info("Call recording enabled — writing to %s", self.directory)
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            # Shutdown: let a cancelled flush finish in its thread, then write
+            # what is left and close every file
+            if self._inflight is not None:
+                await asyncio.wait([self._inflight])
+            for recorder in self._recorders.values():
+                recorder.close()
+            await self.flush()
+
+    async def flush(self) -> None:
+        batches = {call_id: r.take_batch() for call_id, r in self._recorders.items()}
+        for call_id, batch in batches.items():
+            if batch["closed"]:
+                del self._recorders[call_id]
+        if not batches:
+            return
+
+        started = time.perf_counter()
+        self._inflight = asyncio.ensure_future(asyncio.to_thread(self._write, batches))
+        try:
+            written = await asyncio.shield(self._inflight)
+        except Exception as e:
+            logger.error("Recording flush failed: %s", e)
+            return
+        metrics.recording_flush_seconds.observe(time.perf_counter() - started)
+        for stream, size in written.items():
+            metrics.recording_bytes_total.inc(size, stream=stream)
+
+    def _write(self, batches: dict[str, dict]) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for call_id, batch in batches.items():
+            try:
+                files = self._files.get(call_id)
+                if files is None:
+                    files = self._files[call_id] = _Files(self.directory / call_id)
+                for stream, size in files.write(batch).items():
+                    totals[stream] = totals.get(stream, 0) + size
+            except Exception as e:
+                # One broken call must not cost the others their batch
+                logger.error("Recording %s: write failed: %s", call_id, e)
+            finally:
+                if batch["closed"]:
+                    # Last batch of the call: its recorder is gone, so this is
+                    # the only chance to release the file handles
+                    self._close_files(call_id)
+        return totals
+
+    def _close_files(self, call_id: str) -> None:
+        files = self._files.pop(call_id, None)
+        if files is None:
+            return
+        try:
+            files.close()
+        except Exception as e:
+            logger.error("Recording %s: close failed: %s", call_id, e)
+
+
+_writer: RecordingWriter | None = None
+
+
+def get_recording_writer() -> RecordingWriter | None:
+    """Process-wide writer, or None when recording is disabled."""
+    global _writer
+    if not settings.recording_enabled:
+        return None
+    if _writer is None:
+        directory = (
+            Path(settings.recording_dir)
+            if settings.recording_dir
+            else Path(tempfile.gettempdir()) / "voice_ai_recordings"
+        )
+        _writer = RecordingWriter(
+            directory,
+            flush_interval=settings.recording_flush_interval,
+            max_buffer_bytes=settings.recording_max_buffer_bytes,
+        )
+    return _writer
+
+
+def new_call_id(session_id: int) -> str:
+    """Sortable, unique across worker processes: 20260101-120000-<pid>-<session>."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{session_id}"
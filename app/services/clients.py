@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+from typing import AsyncIterator
+
+import httpx
+from sarvamai import AsyncSarvamAI
+from sarvamai.environment import SarvamAIEnvironment
+
+from core.config import settings
+from services.tts_cache import TTSAudioCache, get_tts_cache
+from services.tts_pool import TTSConnectionPool
+from services.tts_service import SarvamTTSService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceClients:
+    """
+    Process-wide Sarvam clients shared by every call.
+
+    Created once in the FastAPI lifespan and stored on ``app.state.clients``;
+    per-session objects (LLM history, STT stream) only borrow from it.
+    """
+
+    # Model the SDK's chat.completions() pins for every request
+    CHAT_MODEL = "sarvam-m"
+
+    def __init__(self, api_key: str, http_pool_size: int) -> None:
+        self._api_key = api_key
+        self.environment = self.environment_from_settings()
+
+        limits = httpx.Limits(
+            max_connections=http_pool_size,
+            max_keepalive_connections=http_pool_size,
+        )
+        self.http = httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(settings.sarvam_http_timeout),
+        )
+        self.sarvam = AsyncSarvamAI(
+            api_subscription_key=api_key,
+            environment=self.environment,
+            httpx_client=self.http,
+        )
+
+        self.tts_cache: TTSAudioCache | None = get_tts_cache()
+        self.tts_pool = TTSConnectionPool(
+            self.sarvam,
+            model=SarvamTTSService.model,
+            configure_kwargs=SarvamTTSService.configure_kwargs(),
+            max_size=settings.tts_pool_max_size,
+            max_idle=settings.tts_pool_max_idle,
+            health_check_after=settings.tts_pool_health_check_after,
+            ping_timeout=settings.tts_pool_ping_timeout,
+            max_lifetime=settings.tts_pool_max_lifetime,
+        )
+
+        logger.info("Shared service clients created — HTTP pool size %d", http_pool_size)
+
+    @staticmethod
+    def environment_from_settings() -> SarvamAIEnvironment:
+        production = SarvamAIEnvironment.PRODUCTION
+        if not settings.sarvam_base_url and not settings.sarvam_ws_url:
+            return production
+        environment = SarvamAIEnvironment(
+            base=(settings.sarvam_base_url or production.base).rstrip("/"),
+            production=(settings.sarvam_ws_url or production.production).rstrip("/"),
+        )
+        logger.warning(
+            "Using non-production Sarvam endpoints: %s / %s",
+            environment.base,
+            environment.production,
+        )
+        return environment
+
+    @classmethod
+    def from_env(cls) -> "ServiceClients":
+        api_key = os.getenv("SARVAM_API_KEY")
+        if not api_key:
+            raise RuntimeError("SARVAM_API_KEY environment variable is not set")
+        return cls(api_key, settings.sarvam_http_pool_size)
+
+    async def stream_chat_completion(self, payload: dict) -> AsyncIterator[dict]:
+        """
+        Chat completion streamed as server-sent events, yielding each parsed
+        chunk. The SDK's chat.completions() only handles whole JSON bodies,
+        so this goes through the shared HTTP pool directly.
+        """
+        async with self.http.stream(
+            "POST",
+            f"{self.environment.base}/v1/chat/completions",
+            json={**payload, "model": self.CHAT_MODEL, "stream": True},
+            headers={"api-subscription-key": self._api_key},
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                yield json.loads(data)
+
+    async def aclose(self) -> None:
+        await self.tts_pool.close()
+        await self.http.aclose()
+        logger.info("Shared service clients closed")
@@ -0,0 +1,56 @@
+import itertools
+import logging
+
+from core.config import settings
+from services.tts_service import SarvamTTSService, TTSServiceError
+
+logger = logging.getLogger(__name__)
+
+
+class FillerBank:
+    """
+    Short acknowledgements ("சரி, ஒரு நிமிஷம்") rendered to pipeline PCM
+    once at startup. ``pick()`` hands them out in turn, so consecutive
+    turns do not repeat the same filler.
+    """
+
+    def __init__(self, phrases: list[str]) -> None:
+        self.phrases = [phrase for phrase in phrases if phrase.strip()]
+        self._pcm: list[bytes] = []
+        self._cycle: itertools.cycle | None = None
+
+    def __len__(self) -> int:
+        return len(self._pcm)
+
+    async def load(self, tts: SarvamTTSService) -> int:
+        """Render every phrase (through the TTS cache); returns how many are ready."""
+        rendered: list[bytes] = []
+        for phrase in self.phrases:
+            try:
+                pcm = await tts.synthesize(phrase)
+            except TTSServiceError as e:
+                logger.warning("Filler %r not rendered: %s", phrase, e)
+                continue
+            if pcm:
+                rendered.append(pcm)
+        self._pcm = rendered
+        self._cycle = itertools.cycle(rendered) if rendered else None
+        logger.info("Filler bank ready — %d of %d phrases", len(rendered), len(self.phrases))
+        return len(rendered)
+
+    def pick(self) -> bytes | None:
+        """Next filler's PCM, or None until the bank has loaded."""
+        return next(self._cycle) if self._cycle is not None else None
+
+
+_bank: FillerBank | None = None
+
+
+def get_filler_bank() -> FillerBank | None:
+    """Process-wide filler bank, or None when fillers are disabled."""
+    global _bank
+    if not settings.filler_enabled:
+        return None
+    if _bank is None:
+        _bank = FillerBank(settings.filler_phrases)
+    return _bank
@@ -1,6 +1,12 @@
+import asyncio
 import logging
 from pathlib import Path
 
+import httpx
+
+from core.config import settings
+from services.order_feed import parse_order
+
 logger = logging.getLogger(__name__)
 
 BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
@@ -26,8 +32,25 @@ def get_greeting(filepath: Path = GREETING_FILE) -> str:
     return text
 
 
-async def get_greeting_from_api() -> str:
-    raise NotImplementedError("API-based greeting provider is not yet implemented")
+async def load_greeting(filepath: Path = GREETING_FILE) -> str:
+    """``get_greeting`` without blocking the event loop on file I/O."""
+    return await asyncio.to_thread(get_greeting, filepath)
+
+
+async def get_greeting_from_api(order_id: str, http: httpx.AsyncClient, url: str = "") -> str:
+    """
+    Order details for ``order_id`` from the order API (``GET
+    {ORDER_FEED_URL}/{order_id}``), over the shared pool (``clients.http``).
+    """
+    base = (url or settings.order_feed_url).rstrip("/")
+    if not base:
+        raise ValueError("ORDER_FEED_URL is not set")
+
+    response = await http.get(f"{base}/{order_id}", timeout=5.0)
+    response.raise_for_status()
+    order = parse_order(response.json(), default_id=order_id)
+    logger.info("Order %s loaded from %s", order_id, base)
+    return order.details
 
 
 if __name__ == "__main__":
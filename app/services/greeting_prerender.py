@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from core import metrics
+from core.config import settings
+from services.clients import ServiceClients
+from services.greeting_loader import get_greeting_from_api
+from services.llm_service import LLMService
+from services.order_feed import Order, OrderFeed
+from services.tts_service import SarvamTTSService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderedGreeting:
+    order: Order
+    # LLM reply ({"response", "end_conversation"}) for order.details
+    reply: dict
+    # Pipeline PCM of reply["response"], ready for the egress
+    pcm: bytes
+    rendered_at: float
+
+
+class GreetingPrerenderer:
+    """
+    Renders each order's opening turn (confirmation LLM call + TTS) as soon
+    as the order arrives, before the call is placed. ``take(order_id)``
+    hands the render to the call so setup is just playback.
+
+    ``concurrency`` workers render from a queue. Renders and known orders
+    expire after ``ttl`` seconds, and renders are held up to ``max_bytes``
+    of PCM in total (oldest dropped first).
+    """
+
+    def __init__(
+        self,
+        clients: ServiceClients,
+        concurrency: int = 4,
+        ttl: float = 900.0,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self._clients = clients
+        self._tts = SarvamTTSService(clients.tts_pool, clients.tts_cache)
+        self.concurrency = max(1, concurrency)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._queue: asyncio.Queue[Order] = asyncio.Queue()
+        # order_id → entries still waiting in the queue
+        self._queued: Counter[str] = Counter()
+        self._orders: OrderedDict[str, Order] = OrderedDict()
+        self._ready: OrderedDict[str, RenderedGreeting] = OrderedDict()
+        self._ready_bytes = 0
+        # Renders in progress; a call for one of these waits for it
+        self._rendering: dict[str, asyncio.Future] = {}
+        # Calls that started before their render (queued or in progress):
+        # the queued entry is skipped, an in-progress render is not stored
+        self._claimed: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+
+    # -------------------------
+    # Feed → queue → workers
+    # -------------------------
+
+    async def run(self, feed: OrderFeed) -> None:
+        """Render every order from ``feed`` until cancelled."""
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        self._workers.append(asyncio.create_task(self._expire_periodically()))
+        try:
+            async for order in feed.orders():
+                self.submit(order)
+        except Exception as e:
+            logger.error("Order feed stopped: %s", e)
+        finally:
+            await self.aclose()
+
+    def submit(self, order: Order) -> None:
+        self._expire()
+        self._orders[order.order_id] = order
+        self._orders.move_to_end(order.order_id)
+        self._queue.put_nowait(order)
+        self._queued[order.order_id] += 1
+        logger.info("Order %s queued for greeting pre-render", order.order_id)
+
+    async def _worker(self) -> None:
+        while True:
+            order = await self._queue.get()
+            self._queued[order.order_id] -= 1
+            if self._queued[order.order_id] <= 0:
+                del self._queued[order.order_id]
+            try:
+                if self._skip(order):
+                    continue
+                await self._render(order)
+            finally:
+                self._queue.task_done()
+
+    def _skip(self, order: Order) -> bool:
+        if order.order_id in self._claimed:
+            self._claimed.discard(order.order_id)
+            return True
+        if time.monotonic() - order.received_at > self.ttl:
+            metrics.greeting_prerenders_total.inc(outcome="expired")
+            return True
+        return False
+
+    async def _render(self, order: Order) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[order.order_id] = future
+        started = time.monotonic()
+        rendered = None
+        try:
+            llm = LLMService(self._clients)
+            reply = await llm.generate_confirmation(order.details, commit=False)
+            text = reply.get("response", str(reply))
+            pcm = await self._tts.synthesize(text)
+            rendered = RenderedGreeting(order, reply, pcm, time.monotonic())
+        except Exception as e:
+            metrics.greeting_prerenders_total.inc(outcome="failed")
+            logger.warning("Greeting pre-render failed for order %s: %s", order.order_id, e)
+        finally:
+            del self._rendering[order.order_id]
+            future.set_result(rendered)
+
+        # A call that arrived mid-render took it straight from the future
+        claimed = order.order_id in self._claimed
+        self._claimed.discard(order.order_id)
+        if rendered is None:
+            return
+        metrics.greeting_prerenders_total.inc(outcome="rendered")
+        logger.info(
+            "Greeting for order %s pre-rendered in %d ms — %d bytes",
+            order.order_id,
+            (time.monotonic() - started) * 1000,
+            len(rendered.pcm),
+        )
+        if claimed:
+            return
+        self._pop_ready(order.order_id)
+        self._ready[order.order_id] = rendered
+        self._ready_bytes += len(rendered.pcm)
+        while self._ready_bytes > self.max_bytes and self._ready:
+            self._pop_ready()
+            metrics.greeting_prerenders_total.inc(outcome="expired")
+        self._export_ready()
+
+    # -------------------------
+    # Calls
+    # -------------------------
+
+    async def take(self, order_id: str) -> RenderedGreeting | None:
+        """The render for ``order_id`` (waiting for one in progress), or None."""
+        self._expire()
+        rendered = self._pop_ready(order_id)
+        if rendered is None and order_id in self._rendering:
+            self._claimed.add(order_id)
+            rendered = await asyncio.shield(self._rendering[order_id])
+        elif rendered is None and order_id in self._queued:
+            # Still queued: the call renders it live instead. Orders already
+            # used or failed are not claimed, so a re-listing renders again
+            self._claimed.add(order_id)
+
+        self._export_ready()
+        metrics.greeting_prerenders_total.inc(outcome="used" if rendered else "missed")
+        return rendered
+
+    async def order_details(self, order_id: str) -> str | None:
+        """Details of a known order, else from the order API when one is configured."""
+        order = self._orders.get(order_id)
+        if order is not None:
+            return order.details
+        if settings.order_feed_url:
+            try:
+                return await get_greeting_from_api(order_id, self._clients.http)
+            except Exception as e:
+                logger.warning("Order %s lookup failed: %s", order_id, e)
+        return None
+
+    async def _expire_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, max(1.0, self.ttl / 4)))
+            self._expire()
+
+    def _expire(self) -> None:
+        horizon = time.monotonic() - self.ttl
+        while self._ready and next(iter(self._ready.values())).rendered_at < horizon:
+            order_id = self._pop_ready().order.order_id
+            metrics.greeting_prerenders_total.inc(outcome="expired")
+            logger.info("Unused greeting render for order %s expired", order_id)
+        while self._orders and next(iter(self._orders.values())).received_at < horizon:
+            order_id, _ = self._orders.popitem(last=False)
+            if order_id not in self._queued and order_id not in self._rendering:
+                self._claimed.discard(order_id)
+        self._export_ready()
+
+    def _export_ready(self) -> None:
+        metrics.greeting_prerenders_ready.set(len(self._ready))
+        metrics.greeting_prerenders_ready_bytes.set(self._ready_bytes)
+
+    def _pop_ready(self, order_id: str | None = None) -> RenderedGreeting | None:
+        """Remove the render for ``order_id`` (default: the oldest) from the store."""
+        if order_id is None:
+            _, rendered = self._ready.popitem(last=False)
+        else:
+            rendered = self._ready.pop(order_id, None)
+        if rendered is not None:
+            self._ready_bytes -= len(rendered.pcm)
+        return rendered
+
+    async def aclose(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+def prerenderer_from_settings(clients: ServiceClients) -> GreetingPrerenderer:
+    return GreetingPrerenderer(
+        clients,
+        concurrency=settings.greeting_prerender_concurrency,
+        ttl=settings.greeting_prerender_ttl,
+        max_bytes=settings.greeting_prerender_max_bytes,
+    )
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    When to send a hedge: once a request has been running longer than the
+    ``percentile`` of the last ``window`` latencies (never sooner than
+    ``min_delay``). ``default_delay`` applies until ``min_samples`` requests
+    have been observed. Every attempt is observed, including failed ones and
+    losers cancelled at the elapsed time, so slow requests are not dropped
+    from the history just because a hedge beat them.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        min_delay: float = 0.3,
+        default_delay: float = 1.5,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def delay(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return max(self.min_delay, self.default_delay)
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+
+async def _first_success(attempts: list[asyncio.Future], timeout: float | None) -> asyncio.Future:
+    """First attempt to finish without an error, else the last failed one."""
+    pending = set(attempts)
+    failed = None
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + timeout if timeout is not None else None
+    while pending:
+        remaining = expires - loop.time() if expires is not None else None
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            raise asyncio.TimeoutError
+        for attempt in done:
+            if attempt.cancelled() or attempt.exception() is not None:
+                failed = attempt
+            else:
+                return attempt
+    return failed
+
+
+def _timed(attempt: asyncio.Future, observe: Callable[[float], None] | None) -> asyncio.Future:
+    """Report ``attempt``'s elapsed time to ``observe`` however it ends."""
+    if observe is not None:
+        started = time.perf_counter()
+        attempt.add_done_callback(lambda _: observe(time.perf_counter() - started))
+    return attempt
+
+
+def _failed(attempt: asyncio.Future) -> bool:
+    # An exhausted stream (StopAsyncIteration) is an answer, not a failure
+    return attempt.cancelled() or (
+        attempt.exception() is not None
+        and not isinstance(attempt.exception(), StopAsyncIteration)
+    )
+
+
+async def _start_hedge(
+    attempts: list[asyncio.Future],
+    start: Callable[[], asyncio.Future],
+    delay: float | None,
+    deadline: float | None,
+    kind: str,
+) -> float | None:
+    """
+    Wait up to ``delay`` for the first attempt, then add a second; if the
+    first fails sooner the second starts right away. Returns the deadline left.
+    """
+    if delay is None:
+        return deadline
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    done, _ = await asyncio.wait(
+        attempts, timeout=delay if deadline is None else min(delay, deadline)
+    )
+    elapsed = loop.time() - started
+    if done and _failed(attempts[0]):
+        metrics.llm_hedges_fired_total.inc(kind=kind)
+        logger.info("%s request failed after %d ms — hedging now", kind, elapsed * 1000)
+        attempts.append(start())
+    elif not done and (deadline is None or delay < deadline):
+        metrics.llm_hedges_fired_total.inc(kind=kind)
+        logger.info("%s request slower than %d ms — hedging", kind, delay * 1000)
+        attempts.append(start())
+    return deadline - elapsed if deadline is not None else None
+
+
+async def hedged_call(
+    call: Callable[[], Awaitable[T]],
+    delay: float | None,
+    deadline: float | None = None,
+    kind: str = "llm",
+    observe: Callable[[float], None] | None = None,
+) -> T:
+    """
+    Result of ``call()``. If it has not returned after ``delay`` seconds (or
+    failed sooner) a second ``call()`` races it and the first success wins;
+    the other is cancelled. Raises ``asyncio.TimeoutError`` after
+    ``deadline`` seconds. Each attempt's duration goes to ``observe``.
+    """
+
+    def start() -> asyncio.Future:
+        return _timed(asyncio.ensure_future(call()), observe)
+
+    attempts = [start()]
+    try:
+        remaining = await _start_hedge(attempts, start, delay, deadline, kind)
+        winner = await _first_success(attempts, remaining)
+        if winner is not attempts[0]:
+            metrics.llm_hedges_won_total.inc(kind=kind)
+        return winner.result()
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+        await asyncio.gather(*attempts, return_exceptions=True)
+
+
+async def hedged_stream(
+    open_stream: Callable[[], AsyncIterator[T]],
+    delay: float | None,
+    deadline: float | None = None,
+    kind: str = "llm_stream",
+    observe: Callable[[float], None] | None = None,
+) -> AsyncIterator[T]:
+    """
+    Items of ``open_stream()``. If the first item takes longer than
+    ``delay`` seconds (or the stream fails sooner) a second stream is
+    opened, and whichever yields first is used to the end; the other is
+    closed. Raises ``asyncio.TimeoutError`` when no stream has yielded
+    within ``deadline`` seconds. Each stream's time to its first item goes
+    to ``observe``.
+    """
+    streams: list[AsyncIterator[T]] = []
+
+    def start() -> asyncio.Future:
+        streams.append(open_stream())
+        return _timed(asyncio.ensure_future(anext(streams[-1])), observe)
+
+    firsts = [start()]
+
+    try:
+        remaining = await _start_hedge(firsts, start, delay, deadline, kind)
+        winner = await _first_success(firsts, remaining)
+        index = firsts.index(winner)
+        if index > 0:
+            metrics.llm_hedges_won_total.inc(kind=kind)
+        try:
+            first = winner.result()
+        except StopAsyncIteration:
+            return
+        # Close the loser before relaying, so it stops holding an LLM slot
+        for i, other in enumerate(firsts):
+            if i != index:
+                other.cancel()
+                await asyncio.gather(other, return_exceptions=True)
+                await streams[i].aclose()
+
+        yield first
+        async for item in streams[index]:
+            yield item
+    finally:
+        for attempt in firsts:
+            attempt.cancel()
+        await asyncio.gather(*firsts, return_exceptions=True)
+        for stream in streams:
+            await stream.aclose()
@@ -0,0 +1,211 @@
+import json
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Compaction trims to this fraction of the budget, so it runs in batches
+# instead of on every turn once the limit is reached
+LOW_WATERMARK = 0.75
+NOTE_MAX_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate: ~3 UTF-8 bytes per token. Slightly generous for
+    English, about right for Tamil script (3 bytes/char, 1-2 chars/token).
+    """
+    return math.ceil(len(text.encode("utf-8")) / 3) + MESSAGE_OVERHEAD_TOKENS
+
+
+def spoken_text(content: str) -> str:
+    """The ``response`` field of a stored assistant JSON reply, or the raw text."""
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return content
+    if isinstance(data, dict) and isinstance(data.get("response"), str):
+        return data["response"]
+    return content
+
+
+def _clip(text: str, limit: int = NOTE_MAX_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class _Turn:
+    __slots__ = ("user", "assistant", "tokens")
+
+    def __init__(self, user: str, assistant: str) -> None:
+        self.user = user
+        self.assistant = assistant
+        self.tokens = estimate_tokens(user) + estimate_tokens(assistant)
+
+
+class ConversationHistory:
+    """
+    Chat history limited by an estimated token budget instead of a message
+    count.
+
+    The prompt is laid out as::
+
+        system prompt | first turn (order details + greeting) | recent turns
+
+    The first two parts are pinned and never change during a call, so every
+    request shares a byte-identical prefix that provider-side prompt caching
+    can reuse. When the total goes over ``max_tokens``, the oldest recent
+    turns are compacted into a structured summary (confirmed items, open
+    questions, short notes of the exchanges not yet summarised) that rides
+    at the front of the first unpinned user message. The last ``min_turns``
+    turns are always kept verbatim.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: int = 2000,
+        min_turns: int = 2,
+        summary_max_tokens: int = 300,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.min_turns = min_turns
+        self.summary_max_tokens = summary_max_tokens
+
+        self._prefix: list[dict] = [{"role": "system", "content": system_prompt}]
+        self._prefix_tokens = estimate_tokens(system_prompt)
+        self._pinned = False
+        self._recent: list[_Turn] = []
+
+        # Structured summary of compacted turns
+        self.confirmed: list[str] = []
+        self.open_questions: list[str] = []
+        # Compacted turns not yet folded into confirmed / open_questions
+        self._pending: list[_Turn] = []
+        self._summary_text = ""
+
+        self._messages: list[dict] | None = None
+        self.turns_compacted = 0
+        # Bumped by every commit; a reply generated at an older revision is stale
+        self.revision = 0
+
+    # -------------------------
+    # Prompt
+    # -------------------------
+
+    def messages(self, user_text: str) -> list[dict]:
+        """Full prompt for the next request, ending with ``user_text``."""
+        if self._messages is None:
+            self._messages = self._render()
+
+        if not self._recent and self._summary_text:
+            user_text = f"{self._summary_text}\n\n{user_text}"
+        return self._messages + [{"role": "user", "content": user_text}]
+
+    def _render(self) -> list[dict]:
+        rendered = list(self._prefix)
+        for index, turn in enumerate(self._recent):
+            user = turn.user
+            if index == 0 and self._summary_text:
+                user = f"{self._summary_text}\n\n{user}"
+            rendered.append({"role": "user", "content": user})
+            rendered.append({"role": "assistant", "content": turn.assistant})
+        return rendered
+
+    def last_reply(self) -> str:
+        """Spoken text of the most recent assistant message, or ""."""
+        if self._recent:
+            return spoken_text(self._recent[-1].assistant)
+        if self._pinned:
+            return spoken_text(self._prefix[-1]["content"])
+        return ""
+
+    @property
+    def total_tokens(self) -> int:
+        return (
+            self._prefix_tokens
+            + sum(turn.tokens for turn in self._recent)
+            + (estimate_tokens(self._summary_text) if self._summary_text else 0)
+        )
+
+    # -------------------------
+    # Updates
+    # -------------------------
+
+    def commit(self, user_text: str, assistant_content: str) -> int:
+        """
+        Record a finished turn. Returns how many turns were compacted out of
+        the verbatim window by this call.
+        """
+        self._messages = None
+        self.revision += 1
+
+        if not self._pinned:
+            # The first turn carries the raw order details: pin it with the system prompt
+            self._prefix.append({"role": "user", "content": user_text})
+            self._prefix.append({"role": "assistant", "content": assistant_content})
+            self._prefix_tokens += estimate_tokens(user_text) + estimate_tokens(assistant_content)
+            self._pinned = True
+            return 0
+
+        self._recent.append(_Turn(user_text, assistant_content))
+        if self.total_tokens <= self.max_tokens:
+            return 0
+
+        target = int(self.max_tokens * LOW_WATERMARK)
+        compacted = 0
+        while len(self._recent) > self.min_turns and self.total_tokens > target:
+            self._pending.append(self._recent.pop(0))
+            self._update_summary_text()
+            compacted += 1
+
+        if compacted:
+            self.turns_compacted += compacted
+            logger.info(
+                "History compacted — %d turns summarised, ~%d tokens in prompt",
+                compacted,
+                self.total_tokens,
+            )
+        return compacted
+
+    def summary_snapshot(self) -> tuple[dict, list[tuple[str, str]]]:
+        """Current structured summary and the pending turns, for summarisation."""
+        summary = {"confirmed": list(self.confirmed), "open_questions": list(self.open_questions)}
+        pending = [(turn.user, spoken_text(turn.assistant)) for turn in self._pending]
+        return summary, pending
+
+    def apply_summary(self, summary: dict, covered: int) -> None:
+        """
+        Replace confirmed / open questions with ``summary``, which covers the
+        first ``covered`` pending turns (later ones stay as notes).
+        """
+        self.confirmed = [str(item) for item in summary.get("confirmed") or []]
+        self.open_questions = [str(item) for item in summary.get("open_questions") or []]
+        del self._pending[:covered]
+        self._messages = None
+        self._update_summary_text()
+
+    def _update_summary_text(self) -> None:
+        def render(notes: list[str]) -> str:
+            lines = ["[Summary of the earlier part of this call]"]
+            if self.confirmed:
+                lines.append("Confirmed: " + "; ".join(self.confirmed))
+            if self.open_questions:
+                lines.append("Open questions: " + "; ".join(self.open_questions))
+            lines.extend(notes)
+            return "\n".join(lines)
+
+        notes = [
+            f"- Owner: {_clip(turn.user)} / You: {_clip(spoken_text(turn.assistant))}"
+            for turn in self._pending
+        ]
+        text = render(notes)
+        # Oldest notes go first once the summary itself is over budget
+        while notes and estimate_tokens(text) > self.summary_max_tokens:
+            notes.pop(0)
+            text = render(notes)
+
+        self._summary_text = text if (self.confirmed or self.open_questions or notes) else ""
+        self._messages = None
@@ -0,0 +1,127 @@
+import json
+import logging
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTENTS_FILE: Path = Path(__file__).resolve().parent.parent / "data" / "intents.json"
+
+
+class IntentTableError(ValueError):
+    """Raised when the intent phrase table is missing or malformed."""
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    name: str
+    # None = repeat the agent's previous reply
+    response: str | None
+    end_conversation: bool
+
+
+def normalize(text: str) -> list[str]:
+    """
+    NFC, lower-case, punctuation/symbols → spaces, split on whitespace.
+    Tamil vowel signs and viramas are combining marks, not punctuation, so
+    they are kept (``\\w``-style tokenizing would split words at them).
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    cleaned = "".join(
+        " " if unicodedata.category(ch)[0] in "PSZC" else ch
+        for ch in text
+    )
+    return cleaned.split()
+
+
+class IntentClassifier:
+    """
+    Deterministic matcher for short, unambiguous owner replies.
+
+    An utterance matches only if *every* normalized token is covered by
+    phrases of a single intent (longest phrase first) or by filler words,
+    and it has at most ``max_tokens`` tokens. Anything else — an unknown
+    word, a mix like "சரி ஆனா இல்லை", a long sentence — goes to the LLM.
+    """
+
+    def __init__(self, table: dict, max_tokens: int = 4) -> None:
+        self.max_tokens = max_tokens
+        self._fillers = frozenset(
+            token for word in table.get("fillers", []) for token in normalize(word)
+        )
+        self._phrases: dict[tuple[str, ...], str] = {}
+        self._intents: dict[str, IntentMatch] = {}
+
+        for name, spec in table.get("intents", {}).items():
+            self._intents[name] = IntentMatch(
+                name=name,
+                response=spec.get("response"),
+                end_conversation=bool(spec.get("end_conversation", False)),
+            )
+            for phrase in spec.get("phrases", []):
+                tokens = tuple(normalize(phrase))
+                if tokens:
+                    self._phrases[tokens] = name
+
+        self._longest = max((len(p) for p in self._phrases), default=0)
+
+    @classmethod
+    def from_file(cls, path: Path = INTENTS_FILE, max_tokens: int = 4) -> "IntentClassifier":
+        try:
+            table = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise IntentTableError(f"Cannot load intent table {path}: {e}") from e
+        if not isinstance(table, dict) or not isinstance(table.get("intents"), dict):
+            raise IntentTableError(f"Intent table {path} has no 'intents' object")
+        return cls(table, max_tokens=max_tokens)
+
+    @property
+    def phrase_count(self) -> int:
+        return len(self._phrases)
+
+    def responses(self) -> list[str]:
+        """Fixed response texts, for pre-synthesis."""
+        return [m.response for m in self._intents.values() if m.response]
+
+    def match(self, text: str) -> IntentMatch | None:
+        found = self._match_tokens(normalize(text))
+        return self._intents[found] if found is not None else None
+
+    def _match_tokens(self, tokens: list[str]) -> str | None:
+        if not tokens or len(tokens) > self.max_tokens:
+            return None
+
+        found: set[str] = set()
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self._longest, len(tokens) - i), 0, -1):
+                intent = self._phrases.get(tuple(tokens[i:i + length]))
+                if intent is not None:
+                    found.add(intent)
+                    i += length
+                    break
+            else:
+                if tokens[i] not in self._fillers:
+                    return None
+                i += 1
+
+        # Only fillers, or conflicting intents: not confident
+        return found.pop() if len(found) == 1 else None
+
+
+_classifier: IntentClassifier | None = None
+
+
+def get_intent_classifier() -> IntentClassifier | None:
+    """Process-wide classifier, or None when the fast path is disabled."""
+    global _classifier
+    if not settings.intent_fast_path_enabled:
+        return None
+    if _classifier is None:
+        path = Path(settings.intent_phrases_file) if settings.intent_phrases_file else INTENTS_FILE
+        _classifier = IntentClassifier.from_file(path, max_tokens=settings.intent_max_tokens)
+        logger.info("Intent fast path ready — %d phrases from %s", _classifier.phrase_count, path)
+    return _classifier
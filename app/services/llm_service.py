@@ -1,10 +1,17 @@
 import asyncio
 import logging
-import os
 import json
 import re
-from prompts.system_prompt import SYSTEM_PROMPT
-from sarvamai import SarvamAI
+from typing import AsyncIterator
+
+from core import metrics
+from core.config import settings
+from core.session_manager import get_session_manager
+from prompts.system_prompt import HISTORY_SUMMARY_PROMPT, SYSTEM_PROMPT
+from services.clients import ServiceClients
+from services.hedging import HedgePolicy, hedged_call, hedged_stream
+from services.history_manager import ConversationHistory
+from services.response_stream import ResponseStreamParser
 
 logger = logging.getLogger(__name__)
 
@@ -13,30 +20,170 @@ class LLMServiceError(Exception):
     """Raised when LLM generation fails."""
 
 
+class LLMTimeoutError(LLMServiceError):
+    """Raised when the LLM misses LLM_TIMEOUT_MS."""
+
+
+def _hedge_policy() -> HedgePolicy:
+    return HedgePolicy(
+        percentile=settings.llm_hedge_percentile,
+        min_delay=settings.llm_hedge_min_ms / 1000,
+        default_delay=settings.llm_hedge_default_ms / 1000,
+    )
+
+
+# Process-wide latency history: whole replies and time to first streamed token
+_complete_hedge = _hedge_policy()
+_stream_hedge = _hedge_policy()
+
+
+def _deadline() -> float | None:
+    return settings.llm_timeout_ms / 1000 if settings.llm_timeout_ms > 0 else None
+
+
 class LLMService:
-    def __init__(self) -> None:
-        api_key = os.getenv("SARVAM_API_KEY")
-        if not api_key:
-            raise RuntimeError("SARVAM_API_KEY environment variable is not set")
-
-        self._client = SarvamAI(api_subscription_key=api_key)
-        self.history = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-    def _call_llm(self, raw_text: str) -> str:
-        messages = self.history + [{"role": "user", "content": raw_text}]
-        response = self._client.chat.completions(
-            messages=messages,
-            temperature=0.2,
-            max_tokens=1000,
+    """Per-session conversation history on top of the shared async client."""
+
+    def __init__(self, clients: ServiceClients) -> None:
+        self._clients = clients
+        self._client = clients.sarvam
+        self.history = ConversationHistory(
+            SYSTEM_PROMPT,
+            max_tokens=settings.llm_history_max_tokens,
+            min_turns=settings.llm_history_min_turns,
+            summary_max_tokens=settings.llm_summary_max_tokens,
         )
-        content = response.choices[0].message.content
-        return content
+        self._summary_task: asyncio.Task | None = None
+        # Turn whose reply is being generated or spoken but not yet in the
+        # history: (owner text, reply sentences produced so far)
+        self._open_turn: tuple[str, list[str]] | None = None
 
-    async def generate_confirmation(self, raw_text: str) -> dict:
+    async def _call_llm(self, raw_text: str) -> str:
+        messages = self.history.messages(raw_text)
+
+        async def request() -> str:
+            async with get_session_manager().llm_slot():
+                response = await self._client.chat.completions(
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=1000,
+                )
+            return response.choices[0].message.content
+
+        delay = _complete_hedge.delay() if settings.llm_hedge_enabled else None
+        try:
+            return await hedged_call(
+                request, delay, _deadline(), kind="complete", observe=_complete_hedge.observe
+            )
+        except asyncio.TimeoutError:
+            metrics.deadlines_exceeded_total.inc(stage="llm")
+            raise LLMTimeoutError(f"no reply within {settings.llm_timeout_ms} ms") from None
+
+    async def _stream_deltas(self, messages: list[dict]) -> AsyncIterator[str]:
+        """Content deltas of one streamed completion, holding an LLM slot throughout."""
+        async with get_session_manager().llm_slot():
+            stream = self._clients.stream_chat_completion(
+                {"messages": messages, "temperature": 0.2, "max_tokens": 1000}
+            )
+            async for chunk in stream:
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+    def _commit_turn(self, raw_text: str, assistant_content: str) -> None:
+        # An interrupted turn goes in first, so the history stays in call order
+        self._commit_interrupted()
+        # Storing the raw completion so context structure is predictable for next generation
+        compacted = self.history.commit(raw_text, assistant_content)
+
+        # Refine the compacted turns into confirmed items / open questions off
+        # the critical path; the extractive notes stand in until it finishes
+        if (
+            compacted
+            and settings.llm_history_summarize
+            and (self._summary_task is None or self._summary_task.done())
+        ):
+            self._summary_task = asyncio.create_task(self._summarize_history())
+
+    async def _summarize_history(self) -> None:
+        summary, pending = self.history.summary_snapshot()
+        if not pending:
+            return
+
+        exchanges = [{"owner": user, "assistant": assistant} for user, assistant in pending]
+        try:
+            async with get_session_manager().llm_slot():
+                response = await self._client.chat.completions(
+                    messages=[
+                        {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+                        {
+                            "role": "user",
+                            "content": json.dumps(
+                                {"summary": summary, "exchanges": exchanges}, ensure_ascii=False
+                            ),
+                        },
+                    ],
+                    temperature=0.0,
+                    max_tokens=400,
+                )
+            content = response.choices[0].message.content
+            updated = json.loads(re.sub(r'```json\n|\n```|```', '', content.strip()))
+            if not isinstance(updated, dict) or not {"confirmed", "open_questions"} & updated.keys():
+                raise ValueError("summary is not a confirmed / open_questions object")
+        except Exception as e:
+            logger.warning("History summarisation failed — keeping extractive notes: %s", e)
+            return
+
+        self.history.apply_summary(updated, covered=len(pending))
+        logger.info(
+            "History summary updated — %d confirmed, %d open questions",
+            len(self.history.confirmed),
+            len(self.history.open_questions),
+        )
+
+    def _commit_interrupted(self) -> None:
+        """
+        Commit a turn that was cut off (barge-in) before its reply reached the
+        history, with the part of the reply produced so far. Without it the
+        owner's words, and on the first turn the order details the whole call
+        is about, would be missing from every later prompt.
+        """
+        turn, self._open_turn = self._open_turn, None
+        if turn is None:
+            return
+        raw_text, said = turn
+        logger.info("Committing interrupted turn — %d sentences produced", len(said))
+        self.commit_reply(raw_text, {"response": " ".join(said), "end_conversation": False})
+
+    def record_turn(self, raw_text: str, response: str, end_conversation: bool) -> None:
+        """Add a turn answered without the LLM (intent fast path) to the history."""
+        self.commit_reply(raw_text, {"response": response, "end_conversation": end_conversation})
+
+    def commit_reply(self, raw_text: str, reply: dict) -> None:
+        """Add a reply from ``generate_confirmation(commit=False)`` to the history."""
+        self._commit_turn(raw_text, json.dumps(reply, ensure_ascii=False))
+
+    def close(self) -> None:
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+
+    async def generate_confirmation(self, raw_text: str, commit: bool = True) -> dict:
+        """
+        Full JSON reply for ``raw_text``. With ``commit=False`` (speculative
+        calls) the history is left untouched; see ``commit_reply``.
+        """
         logger.info("LLM request sent — input length: %d chars", len(raw_text))
+        self._commit_interrupted()
+        if commit:
+            self._open_turn = (raw_text, [])
 
         try:
-            result_str = await asyncio.to_thread(self._call_llm, raw_text)
+            metrics.mark("llm_request")
+            result_str = await self._call_llm(raw_text)
+            metrics.mark("llm_complete")
             
             clean_result = re.sub(r'```json\n|\n```|```', '', result_str.strip())
             try:
@@ -46,16 +193,17 @@ class LLMService:
                 result_json = {"response": clean_result, "end_conversation": False}
 
             # Update history after successful generation
-            self.history.append({"role": "user", "content": raw_text})
-            # Storing the raw completion so context structure is predictable for next generation
-            self.history.append({"role": "assistant", "content": clean_result})
-            
-            # Keep history manageable (last 10 turns)
-            if len(self.history) > 21:  # 1 system + 10 user/assistant pairs
-                self.history = [self.history[0]] + self.history[-20:]
+            if commit:
+                self._open_turn = None
+                self._commit_turn(raw_text, clean_result)
 
+        except LLMTimeoutError as e:
+            logger.error("LLM generation failed: %s", e)
+            self._open_turn = None
+            raise
         except Exception as e:
             logger.error("LLM generation failed: %s", e)
+            self._open_turn = None
             raise LLMServiceError(f"LLM generation failed: {e}") from e
 
         if not result_str or not result_str.strip():
@@ -65,6 +213,67 @@ class LLMService:
         logger.info("LLM output parsed successfully")
         return result_json
 
+    async def stream_confirmation(
+        self, raw_text: str
+    ) -> AsyncIterator[tuple[str, object]]:
+        """
+        Streaming variant of generate_confirmation.
+        Yields ("sentence", text) for each complete sentence/clause of the
+        reply as tokens arrive, and ("end_conversation", bool) whenever that
+        field is parsed. History is updated once the completion finishes; a
+        stream that is cut off is committed with the sentences yielded so far
+        before the next request.
+        """
+        logger.info("LLM streaming request sent — input length: %d chars", len(raw_text))
+
+        parser = ResponseStreamParser(min_clause_chars=settings.stream_min_clause_chars)
+        self._commit_interrupted()
+        messages = self.history.messages(raw_text)
+        said: list[str] = []
+        self._open_turn = (raw_text, said)
+
+        delay = _stream_hedge.delay() if settings.llm_hedge_enabled else None
+        try:
+            metrics.mark("llm_request")
+            deltas = hedged_stream(
+                lambda: self._stream_deltas(messages),
+                delay,
+                _deadline(),
+                kind="stream",
+                observe=_stream_hedge.observe,
+            )
+            async for delta in deltas:
+                metrics.mark("llm_first_token")
+                for event in parser.feed(delta):
+                    if event[0] == "sentence":
+                        said.append(event[1])
+                    yield event
+
+            metrics.mark("llm_complete")
+            for event in parser.close():
+                if event[0] == "sentence":
+                    said.append(event[1])
+                yield event
+
+        except asyncio.TimeoutError:
+            metrics.deadlines_exceeded_total.inc(stage="llm")
+            logger.error("LLM streaming missed the %d ms deadline", settings.llm_timeout_ms)
+            self._open_turn = None
+            raise LLMTimeoutError(f"no token within {settings.llm_timeout_ms} ms") from None
+        except Exception as e:
+            logger.error("LLM streaming failed: %s", e)
+            self._open_turn = None
+            raise LLMServiceError(f"LLM streaming failed: {e}") from e
+
+        self._open_turn = None
+        clean_result = parser.cleaned()
+        if not clean_result:
+            logger.error("LLM returned empty response")
+            raise LLMServiceError("LLM returned empty response")
+
+        self._commit_turn(raw_text, clean_result)
+        logger.info("LLM stream completed — %d chars", len(clean_result))
+
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -76,9 +285,11 @@ if __name__ == "__main__":
     )
 
     async def _test() -> None:
-        llm = LLMService()
+        clients = ServiceClients.from_env()
+        llm = LLMService(clients)
         sample_input = "Can you confirm the order for 2 Biryanis?"
         message = await llm.generate_confirmation(sample_input)
         print(f"Generated message:\n{message}")
+        await clients.aclose()
 
     asyncio.run(_test())
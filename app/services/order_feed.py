@@ -0,0 +1,152 @@
+import abc
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OrderFeedError(Exception):
+    """Raised when an order feed is misconfigured or returns bad data."""
+
+
+@dataclass(frozen=True)
+class Order:
+    order_id: str
+    # Raw order text handed to the LLM as the first user message
+    details: str
+    received_at: float = field(default_factory=time.monotonic)
+
+
+def parse_order(data: object, default_id: str | None = None) -> Order:
+    """``{"order_id": ..., "details": ...}`` (or plain text with ``default_id``) → Order."""
+    if isinstance(data, str) and default_id is not None:
+        data = {"order_id": default_id, "details": data}
+    if not isinstance(data, dict):
+        raise OrderFeedError(f"Order is not an object: {data!r}")
+
+    order_id = str(data.get("order_id") or default_id or "").strip()
+    details = str(data.get("details") or "").strip()
+    if not order_id or not details:
+        raise OrderFeedError(f"Order needs 'order_id' and 'details': {data!r}")
+    return Order(order_id=order_id, details=details)
+
+
+class OrderFeed(abc.ABC):
+    """Source of new orders; ``orders()`` yields each order once."""
+
+    @abc.abstractmethod
+    def orders(self) -> AsyncIterator[Order]:
+        ...
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FileOrderFeed(OrderFeed):
+    """
+    Local stand-in for the order API: every ``*.json`` (``{"order_id",
+    "details"}``) or ``*.txt`` (details, order id = file stem) file that
+    appears in ``directory`` is one order. Files are read off the event loop.
+    """
+
+    def __init__(self, directory: Path, poll_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._seen: set[str] = set()
+
+    def _scan(self) -> list[Order]:
+        found: list[Order] = []
+        for path in sorted(self.directory.glob("*")):
+            if path.name in self._seen or path.suffix not in (".json", ".txt"):
+                continue
+            self._seen.add(path.name)
+            try:
+                text = path.read_text(encoding="utf-8")
+                data = json.loads(text) if path.suffix == ".json" else text
+                found.append(parse_order(data, default_id=path.stem))
+            except (OSError, json.JSONDecodeError, OrderFeedError) as e:
+                logger.warning("Skipping order file %s: %s", path.name, e)
+        return found
+
+    async def orders(self) -> AsyncIterator[Order]:
+        if not self.directory.is_dir():
+            raise OrderFeedError(f"Order directory not found: {self.directory}")
+        logger.info("Watching %s for orders", self.directory)
+        while True:
+            for order in await asyncio.to_thread(self._scan):
+                yield order
+            await asyncio.sleep(self.poll_interval)
+
+
+class HTTPOrderFeed(OrderFeed):
+    """
+    Polls ``GET {url}`` for pending orders: a JSON list of ``{"order_id",
+    "details"}`` objects. Orders already yielded are skipped until they have
+    been out of the response for a while. ``GET {url}/{order_id}`` serves a
+    single order (see ``greeting_loader.get_greeting_from_api``).
+    """
+
+    def __init__(self, url: str, poll_interval: float = 1.0, timeout: float = 5.0) -> None:
+        self.url = url.rstrip("/")
+        self.poll_interval = poll_interval
+        self._http = httpx.AsyncClient(timeout=timeout)
+        # order_id → last time it was listed
+        self._seen: dict[str, float] = {}
+
+    async def orders(self) -> AsyncIterator[Order]:
+        logger.info("Polling %s for orders", self.url)
+        while True:
+            try:
+                response = await self._http.get(self.url)
+                response.raise_for_status()
+                listed = response.json()
+                if not isinstance(listed, list):
+                    raise OrderFeedError("order feed did not return a list")
+            except (httpx.HTTPError, ValueError, OrderFeedError) as e:
+                logger.warning("Order feed poll failed: %s", e)
+                listed = []
+
+            now = time.monotonic()
+            for data in listed:
+                try:
+                    order = parse_order(data)
+                except OrderFeedError as e:
+                    logger.warning("Skipping order: %s", e)
+                    continue
+                if order.order_id not in self._seen:
+                    yield order
+                self._seen[order.order_id] = now
+
+            # Forget ids the feed stopped listing long ago
+            horizon = now - max(60.0, self.poll_interval * 10)
+            for order_id in [k for k, seen in self._seen.items() if seen < horizon]:
+                del self._seen[order_id]
+            await asyncio.sleep(self.poll_interval)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def order_feed_from_settings() -> OrderFeed | None:
+    """The feed selected by ORDER_FEED ("" disables it)."""
+    kind = settings.order_feed.lower()
+    if not kind:
+        return None
+    if kind == "file":
+        if not settings.order_feed_path:
+            raise OrderFeedError("ORDER_FEED=file needs ORDER_FEED_PATH")
+        return FileOrderFeed(Path(settings.order_feed_path), settings.order_feed_poll_interval)
+    if kind == "http":
+        if not settings.order_feed_url:
+            raise OrderFeedError("ORDER_FEED=http needs ORDER_FEED_URL")
+        return HTTPOrderFeed(settings.order_feed_url, settings.order_feed_poll_interval)
+    raise OrderFeedError(f"Unknown ORDER_FEED {settings.order_feed!r} (expected file or http)")
@@ -0,0 +1,202 @@
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Sentence terminators (Latin + Devanagari danda); clause breaks only split
+# once the pending text is long enough to be worth its own TTS request.
+SENTENCE_ENDINGS = frozenset(".?!।\n")
+CLAUSE_ENDINGS = frozenset(",;:")
+
+_RESPONSE_KEY = re.compile(r'"response"\s*:\s*"')
+_END_KEY = re.compile(r'"end_conversation"\s*:\s*(true|false)')
+_FENCE = re.compile(r"```json\n|\n```|```")
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class ResponseStreamParser:
+    """
+    Incremental parser for the LLM's {"response": ..., "end_conversation": ...}
+    reply. Feed it raw completion deltas; it returns ("sentence", text) events
+    for every finished sentence/clause of the response string and an
+    ("end_conversation", bool) event as soon as that field appears.
+    """
+
+    def __init__(self, min_clause_chars: int = 24) -> None:
+        self.min_clause_chars = min_clause_chars
+        self.raw = ""
+
+        self._scan_pos = 0
+        self._in_response = False
+        self._response_done = False
+        self._end_seen = False
+
+        self._escape = False
+        self._unicode: str | None = None
+        self._pending = ""
+        self._boundary = False
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        events: list[tuple[str, object]] = []
+        self.raw += chunk
+
+        if not self._in_response and not self._response_done:
+            match = _RESPONSE_KEY.search(self.raw)
+            if match:
+                self._in_response = True
+                self._scan_pos = match.end()
+
+        if self._in_response:
+            self._consume(events)
+
+        if not self._end_seen:
+            match = _END_KEY.search(self.raw)
+            if match:
+                self._end_seen = True
+                events.append(("end_conversation", match.group(1) == "true"))
+
+        return events
+
+    def close(self) -> list[tuple[str, object]]:
+        """Flush whatever is left once the completion has finished."""
+        events: list[tuple[str, object]] = []
+
+        if self._in_response or self._response_done:
+            self._emit(events, force=True)
+        else:
+            # Model ignored the JSON contract — speak the whole text instead
+            text = self.cleaned().strip()
+            try:
+                parsed = json.loads(text)
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, dict) and "response" in parsed:
+                text = str(parsed["response"])
+                if not self._end_seen:
+                    self._end_seen = True
+                    events.append(
+                        ("end_conversation", bool(parsed.get("end_conversation", False)))
+                    )
+            if text:
+                logger.warning("No streamed 'response' field found — speaking raw text")
+                events.insert(0, ("sentence", text))
+
+        return events
+
+    def cleaned(self) -> str:
+        """Raw completion with markdown fences stripped (stored in history)."""
+        return _FENCE.sub("", self.raw.strip())
+
+    def _consume(self, events: list[tuple[str, object]]) -> None:
+        text = self.raw
+        pos = self._scan_pos
+
+        while pos < len(text):
+            char = text[pos]
+            pos += 1
+
+            if self._unicode is not None:
+                self._unicode += char
+                if len(self._unicode) == 4:
+                    try:
+                        self._push(chr(int(self._unicode, 16)), events)
+                    except ValueError:
+                        pass
+                    self._unicode = None
+                continue
+
+            if self._escape:
+                self._escape = False
+                if char == "u":
+                    self._unicode = ""
+                else:
+                    self._push(_ESCAPES.get(char, char), events)
+                continue
+
+            if char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_response = False
+                self._response_done = True
+                self._emit(events, force=True)
+                break
+            else:
+                self._push(char, events)
+
+        self._scan_pos = pos
+
+    def _push(self, char: str, events: list[tuple[str, object]]) -> None:
+        # A terminator only closes a sentence when followed by whitespace,
+        # so "2.5" or "10,000" are never split.
+        if self._boundary:
+            self._boundary = False
+            if char.isspace():
+                self._emit(events)
+
+        self._pending += char
+
+        if char in SENTENCE_ENDINGS:
+            self._boundary = True
+            if char == "\n":
+                self._emit(events)
+        elif char in CLAUSE_ENDINGS and len(self._pending.strip()) >= self.min_clause_chars:
+            self._boundary = True
+
+    def _emit(self, events: list[tuple[str, object]], force: bool = False) -> None:
+        segment = self._pending.strip()
+        if not segment:
+            self._pending = ""
+            return
+        if not force and len(segment) < self.min_clause_chars and segment[-1] not in SENTENCE_ENDINGS:
+            return
+        events.append(("sentence", segment))
+        self._pending = ""
+
+
+def _split_after(text: str, endings: frozenset[str]) -> list[str]:
+    parts: list[str] = []
+    start = 0
+    for i, char in enumerate(text):
+        # Same rule as the parser: "2.5" or "10,000" are never split
+        if char in endings and (char == "\n" or i + 1 == len(text) or text[i + 1].isspace()):
+            parts.append(text[start:i + 1])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_segments(text: str, min_chars: int = 24, max_chars: int = 160) -> list[str]:
+    """
+    Cut a complete utterance into pieces that can be synthesised separately:
+    at sentence ends and line breaks (list items), then at clause breaks for
+    pieces still longer than ``max_chars``. Pieces shorter than
+    ``min_chars`` are merged into a neighbour.
+    """
+    parts: list[str] = []
+    for sentence in _split_after(text, SENTENCE_ENDINGS):
+        if len(sentence) > max_chars:
+            parts.extend(_split_after(sentence, CLAUSE_ENDINGS))
+        else:
+            parts.append(sentence)
+
+    segments: list[str] = []
+    for part in parts:
+        if segments and len(segments[-1]) < min_chars:
+            segments[-1] += " " + part
+        else:
+            segments.append(part)
+    if len(segments) > 1 and len(segments[-1]) < min_chars:
+        tail = segments.pop()
+        segments[-1] += " " + tail
+    return segments
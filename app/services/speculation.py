@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from core import metrics
+from services.intent_classifier import normalize
+from services.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class _Speculation:
+    __slots__ = ("text", "key", "revision", "task", "started_at")
+
+    def __init__(self, text: str, revision: int, task: asyncio.Task) -> None:
+        self.text = text
+        self.key = normalize(text)
+        self.revision = revision
+        self.task = task
+        self.started_at = time.monotonic()
+
+
+class SpeculativeResponder:
+    """
+    Starts ``generate_confirmation`` on a partial transcript once it has not
+    changed for ``stable_ms``, without committing it to the history.
+
+    At the end of the turn ``take(final_text)`` hands over the (possibly
+    still running) reply if the final transcript is the same text; otherwise
+    the speculation is cancelled and the turn calls the LLM as usual. At most
+    one speculation runs at a time and ``max_per_session`` are started per
+    call. Outcomes go to ``voice_llm_speculations_total{outcome}``.
+    """
+
+    def __init__(
+        self,
+        llm: LLMService,
+        stable_ms: int = 400,
+        max_per_session: int = 20,
+        allowed: Callable[[], bool] = lambda: True,
+    ) -> None:
+        self._llm = llm
+        self.stable_ms = stable_ms
+        self.max_per_session = max_per_session
+        # Checked when the stability timer fires (e.g. only while the owner speaks)
+        self._allowed = allowed
+
+        self._text = ""
+        self._key: list[str] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._current: _Speculation | None = None
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+
+    def transcript_updated(self, text: str) -> None:
+        """Feed every partial transcript ("" when a new utterance starts)."""
+        key = normalize(text)
+        if key == self._key:
+            return
+        self._text, self._key = text, key
+
+        if self._current is not None and self._current.key != key:
+            self._discard("transcript changed")
+        self._cancel_timer()
+        if key and self.started < self.max_per_session:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.stable_ms / 1000, self._start
+            )
+
+    def _start(self) -> None:
+        self._timer = None
+        if self._current is not None or not self._key or not self._allowed():
+            return
+        if self.started >= self.max_per_session:
+            return
+
+        self.started += 1
+        revision = self._llm.history.revision
+        task = asyncio.create_task(self._llm.generate_confirmation(self._text, commit=False))
+        # A failed speculation is only logged; take() falls back to a normal call
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._current = _Speculation(self._text, revision, task)
+        logger.info("Speculative LLM call #%d on stable partial: %s", self.started, self._text)
+
+    async def take(self, final_text: str) -> dict | None:
+        """The speculative reply for ``final_text``, or None to call the LLM normally."""
+        self._cancel_timer()
+        speculation, self._current = self._current, None
+        self._text, self._key = "", []
+        if speculation is None:
+            return None
+
+        if speculation.key != normalize(final_text):
+            self._waste(speculation, "final transcript differs")
+            return None
+        if speculation.revision != self._llm.history.revision:
+            self._waste(speculation, "history changed")
+            return None
+
+        try:
+            reply = await speculation.task
+        except asyncio.CancelledError:
+            speculation.task.cancel()
+            raise
+        except Exception as e:
+            self._waste(speculation, f"failed: {e}")
+            return None
+
+        # Turn timings show when the reply was available, not when it was requested
+        metrics.mark("llm_complete")
+        self.used += 1
+        metrics.llm_speculations_total.inc(outcome="used")
+        logger.info(
+            "Speculative reply used — started %d ms before the end of the turn",
+            (time.monotonic() - speculation.started_at) * 1000,
+        )
+        return reply
+
+    def discard(self, reason: str) -> None:
+        """Drop any pending speculation (turn answered some other way)."""
+        self._cancel_timer()
+        self._text, self._key = "", []
+        self._discard(reason)
+
+    def close(self) -> None:
+        self.discard("session ended")
+        if self.started:
+            logger.info(
+                "Speculation stats: started=%d used=%d wasted=%d",
+                self.started,
+                self.used,
+                self.wasted,
+            )
+
+    def _discard(self, reason: str) -> None:
+        speculation, self._current = self._current, None
+        if speculation is not None:
+            self._waste(speculation, reason)
+
+    def _waste(self, speculation: _Speculation, reason: str) -> None:
+        speculation.task.cancel()
+        self.wasted += 1
+        metrics.llm_speculations_total.inc(outcome="wasted")
+        logger.info("Speculative reply wasted (%s): %s", reason, speculation.text)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
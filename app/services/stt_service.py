@@ -1,8 +1,8 @@
+import asyncio
 import base64
 import logging
-import os
-import io
-import wave
+import struct
+from functools import lru_cache
 
 from sarvamai import AsyncSarvamAI
 from sarvamai.types.speech_to_text_transcription_data import SpeechToTextTranscriptionData
@@ -17,18 +17,64 @@ class STTServiceError(Exception):
     pass
 
 
+WAV_HEADER_BYTES = 44
+
+
+@lru_cache(maxsize=64)
+def wav_header(pcm_bytes: int, sample_rate: int) -> bytes:
+    """Canonical 44-byte header for mono 16-bit PCM (cached per size)."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + pcm_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,                 # fmt chunk size
+        1,                  # PCM
+        1,                  # mono
+        sample_rate,
+        sample_rate * 2,    # byte rate
+        2,                  # block align
+        16,                 # bits per sample
+        b"data",
+        pcm_bytes,
+    )
+
+
+class WavFramer:
+    """
+    Reusable WAV message buffer for fixed-size STT windows.
+    The header is written once; PCM is copied straight in behind it via
+    ``pcm`` and only the two size fields are patched for a short window.
+    """
+
+    def __init__(self, sample_rate: int, window_bytes: int) -> None:
+        self.sample_rate = sample_rate
+        self.window_bytes = window_bytes
+        self._buf = bytearray(WAV_HEADER_BYTES + window_bytes)
+        self._buf[:WAV_HEADER_BYTES] = wav_header(window_bytes, sample_rate)
+        self._current = window_bytes
+        self.pcm = memoryview(self._buf)[WAV_HEADER_BYTES:]
+
+    def frame(self, pcm_bytes: int) -> memoryview:
+        if pcm_bytes != self._current:
+            struct.pack_into("<I", self._buf, 4, 36 + pcm_bytes)
+            struct.pack_into("<I", self._buf, 40, pcm_bytes)
+            self._current = pcm_bytes
+        return memoryview(self._buf)[:WAV_HEADER_BYTES + pcm_bytes]
+
+
 class SarvamSTTService:
     """
     Streaming STT using Saaras v3 (WAV only).
     We accumulate PCM and stream as continuous WAV.
     """
 
-    def __init__(self) -> None:
-        api_key = os.getenv("SARVAM_API_KEY")
-        if not api_key:
-            raise RuntimeError("SARVAM_API_KEY environment variable is not set")
-
-        self._client = AsyncSarvamAI(api_subscription_key=api_key)
+    def __init__(self, client: AsyncSarvamAI, close_timeout: float = 2.0) -> None:
+        # Shared process-wide client (see services/clients.py)
+        self._client = client
+        self.close_timeout = close_timeout
+        self.close_timed_out = False
         self._stt_ws = None
         self._ctx = None
         self._audio_sent = False
@@ -36,39 +82,50 @@ class SarvamSTTService:
         # 🔥 Important: Must match model expectation
         self.sample_rate = 16000
 
-    async def __aenter__(self):
-        self._ctx = self._client.speech_to_text_streaming.connect(
-            language_code="ta-IN",
-            model="saaras:v3",
-            input_audio_codec="audio/wav",
-            vad_signals="true",
-            high_vad_sensitivity="true",
-        )
-
-        self._stt_ws = await self._ctx.__aenter__()
-        logger.info("STT WebSocket connected (saaras:v3)")
+    async def connect(self) -> "SarvamSTTService":
+        """Open the streaming socket; no-op if it is already open."""
+        if self._ctx is None:
+            ctx = self._client.speech_to_text_streaming.connect(
+                language_code="ta-IN",
+                model="saaras:v3",
+                input_audio_codec="audio/wav",
+                vad_signals="true",
+                high_vad_sensitivity="true",
+            )
+
+            self._stt_ws = await ctx.__aenter__()
+            self._ctx = ctx
+            logger.info("STT WebSocket connected (saaras:v3)")
         return self
 
+    async def close(self) -> None:
+        """Close the socket, giving up (``close_timed_out``) after ``close_timeout`` s."""
+        ctx, self._ctx = self._ctx, None
+        if ctx is None:
+            return
+        try:
+            await asyncio.wait_for(ctx.__aexit__(None, None, None), self.close_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("STT WebSocket close timed out after %.1f s", self.close_timeout)
+            self.close_timed_out = True
+            return
+        logger.info("STT WebSocket closed")
+
+    async def __aenter__(self):
+        return await self.connect()
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._ctx:
-            await self._ctx.__aexit__(exc_type, exc_val, exc_tb)
-            logger.info("STT WebSocket closed")
+        await self.close()
 
     async def send_audio(self, pcm_bytes: bytes) -> None:
         """
         Wrap PCM chunk into WAV container with 16kHz.
         Browser MUST send 16kHz PCM.
         """
+        await self.send_wav(wav_header(len(pcm_bytes), self.sample_rate) + pcm_bytes)
 
-        wav_buffer = io.BytesIO()
-
-        with wave.open(wav_buffer, "wb") as wav_file:
-            wav_file.setnchannels(1)        # mono
-            wav_file.setsampwidth(2)        # 16-bit
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(pcm_bytes)
-
-        wav_bytes = wav_buffer.getvalue()
+    async def send_wav(self, wav_bytes: bytes | memoryview) -> None:
+        """Send an already framed WAV message (see WavFramer)."""
         encoded = base64.b64encode(wav_bytes).decode("ascii")
 
         await self._stt_ws.transcribe(
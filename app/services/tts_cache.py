@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+from core import metrics
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTSAudioCache:
+    """
+    Content-addressed cache for synthesized PCM.
+
+    Two tiers:
+    - memory: LRU of raw bytes, bounded by a byte budget
+    - disk:   one ``<sha256>.pcm`` file per entry, bounded by its own budget
+              (oldest entries evicted first). A disk hit is read in a
+              worker thread and promoted to the memory tier, so a hot
+              phrase pays the disk read once
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        disk_dir: Path | None = None,
+        disk_budget_bytes: int = 0,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_dir = disk_dir
+        self.disk_budget_bytes = disk_budget_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        # Keys being written to disk; a concurrent put() for one is a no-op
+        self._writing: set[str] = set()
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions_memory = 0
+        self.evictions_disk = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+        logger.info(
+            "TTS cache ready — memory budget=%d bytes, disk=%s (%d entries)",
+            memory_budget_bytes,
+            disk_dir,
+            len(self._disk_index),
+        )
+
+    @staticmethod
+    def make_key(
+        text: str, speaker: str, model: str, language: str, sample_rate: int
+    ) -> str:
+        payload = "\x1f".join([model, speaker, language, str(sample_rate), text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        # Membership only: no LRU touch, not counted as a hit or miss
+        return key in self._memory or key in self._disk_index
+
+    async def get(self, key: str) -> bytes | None:
+        pcm = self._memory.get(key)
+        if pcm is not None:
+            self._memory.move_to_end(key)
+            self.hits_memory += 1
+            return pcm
+
+        pcm = await self._read_disk(key)
+        if pcm is not None:
+            self.hits_disk += 1
+            self.put_memory(key, pcm)
+            return pcm
+
+        self.misses += 1
+        return None
+
+    def put_memory(self, key: str, pcm: bytes) -> None:
+        if len(pcm) > self.memory_budget_bytes:
+            return
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = pcm
+        self._memory_bytes += len(pcm)
+
+        while self._memory_bytes > self.memory_budget_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions_memory += 1
+
+    async def put(self, key: str, pcm: bytes) -> None:
+        """Store in memory now and on disk in a worker thread."""
+        self.put_memory(key, pcm)
+
+        if self.disk_dir is None or key in self._disk_index or key in self._writing:
+            return
+        self._writing.add(key)
+        try:
+            if not await asyncio.to_thread(self._write_file, key, pcm):
+                return
+        finally:
+            self._writing.discard(key)
+
+        # Index bookkeeping stays on the event loop thread
+        self._disk_index[key] = len(pcm)
+        self._disk_bytes += len(pcm)
+
+        evicted: list[str] = []
+        while self.disk_budget_bytes and self._disk_bytes > self.disk_budget_bytes:
+            old_key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions_disk += 1
+            evicted.append(old_key)
+        if evicted:
+            await asyncio.to_thread(self._unlink_files, evicted)
+
+    def _write_file(self, key: str, pcm: bytes) -> bool:
+        path = self._path(key)
+        tmp_path: Path | None = None
+        try:
+            # Unique per writer: serve.py workers share the directory and
+            # pre-synthesise the same phrases at startup
+            with tempfile.NamedTemporaryFile(
+                dir=self.disk_dir, prefix=f"{key}.", suffix=".tmp", delete=False
+            ) as tmp:
+                tmp_path = Path(tmp.name)
+                tmp.write(pcm)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("TTS cache disk write failed for %s: %s", key, e)
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def _unlink_files(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "evictions_memory": self.evictions_memory,
+            "evictions_disk": self.evictions_disk,
+            "memory_bytes": self._memory_bytes,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "disk_entries": len(self._disk_index),
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pcm"
+
+    async def _read_disk(self, key: str) -> bytes | None:
+        if self.disk_dir is None or key not in self._disk_index:
+            return None
+        try:
+            # Off the event loop: a cold page cache can take milliseconds
+            pcm = await asyncio.to_thread(self._path(key).read_bytes)
+            if not pcm:
+                raise ValueError("empty file")
+        except (OSError, ValueError) as e:
+            # File vanished or is empty — drop it from the index
+            logger.warning("TTS cache disk read failed for %s: %s", key, e)
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            return None
+
+        if key in self._disk_index:
+            # Not evicted while the read was in flight
+            self._disk_index.move_to_end(key)
+        return pcm
+
+    def _load_disk_index(self) -> None:
+        entries = sorted(self.disk_dir.glob("*.pcm"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            size = path.stat().st_size
+            self._disk_index[path.stem] = size
+            self._disk_bytes += size
+
+
+_cache: TTSAudioCache | None = None
+
+
+def get_tts_cache() -> TTSAudioCache | None:
+    """Process-wide cache instance, or None when caching is disabled."""
+    global _cache
+    if not settings.tts_cache_enabled:
+        return None
+    if _cache is None:
+        disk_dir = (
+            Path(settings.tts_cache_dir)
+            if settings.tts_cache_dir
+            else Path(tempfile.gettempdir()) / "voice_ai_tts_cache"
+        )
+        _cache = TTSAudioCache(
+            memory_budget_bytes=settings.tts_cache_memory_bytes,
+            disk_dir=disk_dir if settings.tts_cache_disk_enabled else None,
+            disk_budget_bytes=settings.tts_cache_disk_bytes,
+        )
+    return _cache
+
+
+def _cache_stats(*fields: tuple[str, str]) -> dict[tuple[str, ...], float]:
+    """``{(label,): stats()[field]}`` for the process cache; empty while it is off."""
+    if _cache is None:
+        return {}
+    stats = _cache.stats()
+    return {(label,): stats[field] for label, field in fields}
+
+
+tts_cache_lookups_total = metrics.Counter(
+    "voice_tts_cache_lookups_total",
+    "TTS cache lookups by result (memory / disk hit, miss)",
+    ("result",),
+    collect=lambda: _cache_stats(("memory", "hits_memory"), ("disk", "hits_disk"), ("miss", "misses")),
+)
+tts_cache_evictions_total = metrics.Counter(
+    "voice_tts_cache_evictions_total",
+    "TTS cache entries evicted to stay within the byte budget, per tier",
+    ("tier",),
+    collect=lambda: _cache_stats(("memory", "evictions_memory"), ("disk", "evictions_disk")),
+)
+tts_cache_bytes = metrics.Gauge(
+    "voice_tts_cache_bytes",
+    "PCM bytes held by the TTS cache, per tier",
+    ("tier",),
+    collect=lambda: _cache_stats(("memory", "memory_bytes"), ("disk", "disk_bytes")),
+)
+tts_cache_entries = metrics.Gauge(
+    "voice_tts_cache_entries",
+    "Utterances held by the TTS cache, per tier",
+    ("tier",),
+    collect=lambda: _cache_stats(("memory", "memory_entries"), ("disk", "disk_entries")),
+)
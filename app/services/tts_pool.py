@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sarvamai import AsyncSarvamAI
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PooledTTSConnection:
+    """A configured TTS streaming socket plus the context that owns it."""
+
+    def __init__(self, ctx, ws) -> None:
+        self._ctx = ctx
+        self.ws = ws
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        # Set by the caller once the stream finished cleanly (completion event
+        # seen); anything else may leave unread audio on the socket.
+        self.reusable = False
+
+    @property
+    def reused(self) -> bool:
+        return self.uses > 1
+
+    async def is_healthy(self, timeout: float) -> bool:
+        sock = getattr(self.ws, "_websocket", None)
+        if sock is None:
+            return True
+        if getattr(sock, "closed", False):
+            return False
+        try:
+            pong_waiter = await sock.ping()
+            await asyncio.wait_for(pong_waiter, timeout)
+        except Exception:
+            return False
+        return True
+
+    async def close(self) -> None:
+        try:
+            await asyncio.wait_for(self._ctx.__aexit__(None, None, None), 2.0)
+        except Exception as e:
+            logger.debug("Error closing TTS connection: %s", e)
+
+
+class TTSConnectionPool:
+    """
+    Per-process pool of configured TTS streaming connections.
+
+    Idle sockets are reused across turns and calls; ones idle for longer than
+    ``health_check_after`` are pinged before reuse, and dead or expired ones
+    are replaced transparently. ``max_size`` caps open sockets per process,
+    idle ones included: every socket outside the idle list (borrowed,
+    being pre-warmed or health-checked) holds one of ``max_size`` slots, and
+    a new one is only opened when none is idle.
+    """
+
+    def __init__(
+        self,
+        client: AsyncSarvamAI,
+        model: str,
+        configure_kwargs: dict,
+        max_size: int = 32,
+        max_idle: int = 8,
+        health_check_after: float = 15.0,
+        ping_timeout: float = 2.0,
+        max_lifetime: float = 300.0,
+    ) -> None:
+        self._client = client
+        self.model = model
+        self.configure_kwargs = configure_kwargs
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.ping_timeout = ping_timeout
+        self.max_lifetime = max_lifetime
+
+        self._idle: list[PooledTTSConnection] = []
+        self._slots = asyncio.Semaphore(max_size)
+        # One warm() at a time, so concurrent calls do not each open a socket
+        self._warm_lock = asyncio.Lock()
+        self._keepalive_task: asyncio.Task | None = None
+        self._closed = False
+
+        self.opened = 0
+        self.reuses = 0
+        self.discarded = 0
+        self.in_use = 0
+        _pools.add(self)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PooledTTSConnection]:
+        """
+        Borrow a configured connection. The caller sets ``conn.reusable``
+        after a clean completion; otherwise the socket is closed on release.
+        """
+        await self._slots.acquire()
+        self.in_use += 1
+        self._ensure_keepalive()
+        conn: PooledTTSConnection | None = None
+        try:
+            conn = await self._checkout()
+            conn.reusable = False
+            conn.uses += 1
+            yield conn
+        finally:
+            self.in_use -= 1
+            try:
+                if conn is not None:
+                    await self._release(conn)
+            finally:
+                self._slots.release()
+
+    async def prewarm(self, count: int) -> None:
+        """Open up to ``count`` idle connections ahead of the first call (slots permitting)."""
+        # Idle sockets count against max_size too: take a slot for each of
+        # them as well, and open only as many as the remaining slots allow
+        wanted = min(count, self.max_idle)
+        slots = 0
+        while slots < wanted and await self._try_slot():
+            slots += 1
+        try:
+            results = await asyncio.gather(
+                *(self._open() for _ in range(slots - len(self._idle))), return_exceptions=True
+            )
+        finally:
+            for _ in range(slots):
+                self._slots.release()
+        for result in results:
+            if isinstance(result, PooledTTSConnection):
+                self._idle.append(result)
+            else:
+                logger.warning("TTS pool prewarm failed: %s", result)
+        logger.info("TTS pool prewarmed — %d idle connections", len(self._idle))
+
+    async def warm(self) -> None:
+        """Open one connection unless one is idle, so the next request skips the handshake."""
+        async with self._warm_lock:
+            if self._idle or self._closed or not await self._try_slot():
+                return
+            try:
+                conn = await self._open()
+                self._ensure_keepalive()
+                conn.reusable = True
+                await self._release(conn)
+            finally:
+                self._slots.release()
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(conn.close() for conn in idle))
+        logger.info("TTS pool closed")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "opened": self.opened,
+            "reuses": self.reuses,
+            "discarded": self.discarded,
+            "idle": len(self._idle),
+            "in_use": self.in_use,
+        }
+
+    async def _try_slot(self) -> bool:
+        """Take a slot if one is free right now; never waits."""
+        if self._slots.locked():
+            return False
+        await self._slots.acquire()
+        return True
+
+    async def _open(self) -> PooledTTSConnection:
+        ctx = self._client.text_to_speech_streaming.connect(
+            model=self.model,
+            send_completion_event=True,
+        )
+        ws = await ctx.__aenter__()
+        try:
+            await ws.configure(**self.configure_kwargs)
+        except BaseException:
+            await ctx.__aexit__(None, None, None)
+            raise
+        self.opened += 1
+        logger.info("TTS pool opened connection (%d total)", self.opened)
+        return PooledTTSConnection(ctx, ws)
+
+    async def _checkout(self) -> PooledTTSConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            now = time.monotonic()
+
+            if now - conn.created_at > self.max_lifetime:
+                await self._discard(conn, "expired")
+                continue
+            if now - conn.last_used > self.health_check_after and not await conn.is_healthy(
+                self.ping_timeout
+            ):
+                await self._discard(conn, "failed health check")
+                continue
+
+            self.reuses += 1
+            return conn
+
+        return await self._open()
+
+    async def _release(self, conn: PooledTTSConnection) -> None:
+        conn.last_used = time.monotonic()
+        if conn.reusable and not self._closed and len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            await conn.close()
+
+    async def _discard(self, conn: PooledTTSConnection, reason: str) -> None:
+        self.discarded += 1
+        logger.info("TTS pool dropping connection — %s", reason)
+        await conn.close()
+
+    def _ensure_keepalive(self) -> None:
+        if self._keepalive_task is None and self.max_idle > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+
+    async def _keepalive(self) -> None:
+        """Ping idle sockets so dead ones are replaced before a turn needs them."""
+        while not self._closed:
+            await asyncio.sleep(self.health_check_after)
+            now = time.monotonic()
+            for conn in list(self._idle):
+                if now - conn.last_used < self.health_check_after:
+                    continue
+                # Out of the idle list the socket needs a slot; retry next round if none
+                if conn not in self._idle or not await self._try_slot():
+                    continue
+                self._idle.remove(conn)
+                try:
+                    if now - conn.created_at > self.max_lifetime:
+                        await self._discard(conn, "expired")
+                    elif await conn.is_healthy(self.ping_timeout):
+                        conn.last_used = time.monotonic()
+                        self._idle.append(conn)
+                    else:
+                        await self._discard(conn, "failed keepalive ping")
+                finally:
+                    self._slots.release()
+
+
+# Pools alive in this process (one per ServiceClients), read at scrape time
+_pools: "weakref.WeakSet[TTSConnectionPool]" = weakref.WeakSet()
+
+
+def _pool_stats(*fields: tuple[str, str]) -> dict[tuple[str, ...], float]:
+    totals = {(label,): 0 for label, _ in fields}
+    for pool in list(_pools):
+        stats = pool.stats()
+        for label, field in fields:
+            totals[(label,)] += stats[field]
+    return totals
+
+
+tts_pool_connections = metrics.Gauge(
+    "voice_tts_pool_connections",
+    "Open TTS streaming sockets: idle in the pool / borrowed by a request",
+    ("state",),
+    collect=lambda: _pool_stats(("idle", "idle"), ("in_use", "in_use")),
+)
+tts_pool_connections_total = metrics.Counter(
+    "voice_tts_pool_connections_total",
+    "TTS socket events: opened (handshakes), reused, discarded (dead / expired, replaced on next use)",
+    ("event",),
+    collect=lambda: _pool_stats(("opened", "opened"), ("reused", "reuses"), ("discarded", "discarded")),
+)
@@ -1,12 +1,20 @@
 import base64
 import logging
-import math
-import os
-import struct
 import asyncio
-from sarvamai import AsyncSarvamAI, AudioOutput
+from typing import AsyncIterator
+
+from sarvamai import AudioOutput, ErrorResponse
 from dotenv import load_dotenv
 
+from core import metrics
+from core.config import settings
+from core.session_manager import get_session_manager
+from services.audio_codec import sine_tone
+from services.audio_egress import AudioEgress
+from services.response_stream import split_segments
+from services.tts_cache import TTSAudioCache
+from services.tts_pool import TTSConnectionPool
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -15,69 +23,341 @@ class TTSServiceError(Exception):
     pass
 
 
-class SarvamTTSService:
+def _first_chunk_timeout() -> float | None:
+    timeout = settings.tts_first_chunk_timeout_ms
+    return timeout / 1000 if timeout > 0 else None
+
+
+class _StreamProgress:
+    """Tracks whether a stream has produced audio (retry is only safe before)."""
+
     def __init__(self) -> None:
-        api_key = os.getenv("SARVAM_API_KEY")
-        if not api_key:
-            raise RuntimeError("SARVAM_API_KEY environment variable is not set")
+        self.audio_started = False
+        self.completed = False
+        # The text source (e.g. the LLM stream) failed — not a socket problem
+        self.source_failed = False
 
-        self._client = AsyncSarvamAI(api_subscription_key=api_key)
 
-        # 🔥 IMPORTANT — match what you actually configure
-        self.speech_sample_rate = 16000
+class _DiscardOutput:
+    """AudioEgress stand-in for synthesis that only fills the cache."""
 
-        logger.info(
+    async def write(self, pcm: bytes) -> None:
+        pass
+
+    async def drain(self) -> None:
+        pass
+
+
+class _CollectOutput(_DiscardOutput):
+    """AudioEgress stand-in that keeps the PCM (ahead-of-time rendering)."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def write(self, pcm: bytes) -> None:
+        self.chunks.append(bytes(pcm))
+
+
+class SarvamTTSService:
+    model = "bulbul:v3"
+    speaker = "pooja"
+    language_code = "ta-IN"
+    # 🔥 IMPORTANT — match what you actually configure
+    speech_sample_rate = 16000
+
+    def __init__(
+        self,
+        pool: TTSConnectionPool,
+        cache: TTSAudioCache | None = None,
+    ) -> None:
+        # Both are process-wide (see services/clients.py); this object is cheap
+        self._pool = pool
+        self._cache = cache
+
+        logger.debug(
             "TTS initialized — sample_rate=%s codec=linear16",
             self.speech_sample_rate,
         )
 
-    async def stream_synthesize(self, text: str, websocket) -> None:
+    @classmethod
+    def configure_kwargs(cls) -> dict:
+        return {
+            "target_language_code": cls.language_code,
+            "speaker": cls.speaker,
+            "speech_sample_rate": cls.speech_sample_rate,
+            "output_audio_codec": "linear16",
+        }
+
+    def cache_key(self, text: str) -> str:
+        return TTSAudioCache.make_key(
+            text,
+            self.speaker,
+            self.model,
+            self.language_code,
+            self.speech_sample_rate,
+        )
+
+    async def _with_connection(self, run) -> None:
+        """
+        Run ``run(ws, progress)`` on a pooled TTS connection. A reused socket
+        that turns out to be dead before any audio was produced is replaced
+        by a fresh one and the request retried once.
+        """
+        for attempt in (1, 2):
+            progress = _StreamProgress()
+            reused = False
+            try:
+                async with get_session_manager().tts_slot(), self._pool.acquire() as conn:
+                    metrics.mark("tts_connect")
+                    reused = conn.reused
+                    await run(conn.ws, progress)
+                    conn.reusable = progress.completed
+                return
+            except Exception as e:
+                if (
+                    attempt == 1
+                    and reused
+                    and not progress.audio_started
+                    and not progress.source_failed
+                ):
+                    logger.warning("Pooled TTS connection failed (%s) — retrying on a fresh one", e)
+                    continue
+                raise
+
+    async def _relay_audio(
+        self,
+        ws,
+        output: AudioEgress,
+        progress: _StreamProgress,
+        chunks: list[bytes] | None = None,
+        first_audio: asyncio.Timeout | None = None,
+    ) -> None:
+        # 🔥 Listen for audio chunks and completion event
+        async for message in ws:
+
+            if isinstance(message, AudioOutput):
+                if not progress.audio_started:
+                    metrics.mark("tts_first_chunk")
+                    if first_audio is not None:
+                        # Audio is flowing: the first-chunk deadline no longer applies
+                        first_audio.reschedule(None)
+                progress.audio_started = True
+                audio_chunk = base64.b64decode(message.data.audio)
+                if chunks is not None:
+                    chunks.append(audio_chunk)
+                # Egress paces playback; the socket keeps being read meanwhile
+                await output.write(audio_chunk)
+
+            elif isinstance(message, ErrorResponse):
+                # Socket state is unknown after an error — never return it to the pool
+                raise TTSServiceError(f"TTS error: {message.data}")
+
+            else:
+                # 🔥 Completion event received - exit immediately
+                logger.info("TTS completion event received: %s", message)
+                progress.completed = True
+                break
+
+    async def stream_synthesize(self, text: str, output: AudioEgress) -> None:
+        """Synthesize ``text`` into ``output``; returns once it has all been sent."""
+        if (
+            settings.tts_segmented_enabled
+            and len(text) >= settings.tts_segment_min_text_chars
+            and (self._cache is None or self.cache_key(text) not in self._cache)
+        ):
+            segments = split_segments(
+                text,
+                min_chars=settings.stream_min_clause_chars,
+                max_chars=settings.tts_segment_max_chars,
+            )
+            if len(segments) > 1:
+                await self._synthesize_segmented(segments, output)
+                await output.drain()
+                return
+
+        await self._synthesize_into(text, output)
+        await output.drain()
+
+    async def _synthesize_segmented(self, segments: list[str], output: AudioEgress) -> None:
+        """
+        Synthesize ``segments`` over up to TTS_SEGMENT_CONCURRENCY streams at
+        once and queue them into ``output`` strictly in order. The first
+        segment streams straight to ``output``, so playback starts as soon as
+        it has audio; later ones are collected while it plays.
+        """
         logger.info(
-            "Streaming TTS request — text length: %d chars", len(text)
+            "Segmented TTS request — %d segments, %d chars",
+            len(segments),
+            sum(len(segment) for segment in segments),
         )
+        slots = asyncio.Semaphore(max(1, settings.tts_segment_concurrency))
+
+        async def render(index: int, segment: str) -> bytes:
+            async with slots:
+                if index == 0:
+                    await self._synthesize_into(segment, output)
+                    return b""
+                # Task-local: only the first segment marks the turn's TTS stages
+                metrics.current_turn.set(None)
+                collected = _CollectOutput()
+                await self._synthesize_into(segment, collected)
+                return b"".join(collected.chunks)
 
+        tasks = [
+            asyncio.create_task(render(index, segment))
+            for index, segment in enumerate(segments)
+        ]
         try:
-            # 🔥 Enable completion event for clean stream termination
-            async with self._client.text_to_speech_streaming.connect(
-                model="bulbul:v3",
-                send_completion_event=True,
-            ) as ws:
-
-                await ws.configure(
-                    target_language_code="ta-IN",
-                    speaker="pooja",
-                    speech_sample_rate=16000,
-                    output_audio_codec="linear16",
-                )
+            for task in tasks:
+                pcm = await task
+                if pcm:
+                    await output.write(pcm)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-                await ws.convert(text)
-                await ws.flush()
+    async def _synthesize_into(self, text: str, output: AudioEgress) -> None:
+        """Queue the audio for ``text`` into ``output`` without waiting for playback."""
+        logger.info(
+            "Streaming TTS request — text length: %d chars", len(text)
+        )
+
+        key = None
+        if self._cache is not None:
+            key = self.cache_key(text)
+            cached = await self._cache.get(key)
+            if cached is not None:
+                logger.info("TTS cache hit — %d bytes", len(cached))
+                metrics.mark("tts_first_chunk")
+                await output.write(cached)
+                return
 
-                logger.info("Text sent to TTS stream and flushed")
+        chunks: list[bytes] = []
+        first_audio = asyncio.timeout(_first_chunk_timeout())
+
+        async def run(ws, progress: _StreamProgress) -> None:
+            chunks.clear()
+            await ws.convert(text)
+            await ws.flush()
+            logger.info("Text sent to TTS stream and flushed")
+            await self._relay_audio(
+                ws, output, progress, chunks if key is not None else None, first_audio
+            )
+
+        try:
+            async with first_audio:
+                await self._with_connection(run)
+            logger.info("TTS stream completed cleanly")
+        except asyncio.TimeoutError:
+            raise self._deadline_exceeded() from None
+        except Exception as e:
+            logger.error("Streaming TTS failed: %s", e)
+            raise TTSServiceError(str(e))
 
-                # 🔥 Listen for audio chunks and completion event
-                async for message in ws:
+        # Only complete utterances are cached
+        if key is not None and chunks:
+            await self._cache.put(key, b"".join(chunks))
 
-                    if isinstance(message, AudioOutput):
-                        audio_chunk = base64.b64decode(message.data.audio)
-                        await websocket.send_bytes(audio_chunk)
+    async def stream_synthesize_iter(
+        self, segments: AsyncIterator[str], output: AudioEgress
+    ) -> None:
+        """
+        Feed one TTS stream with text segments as they are produced (e.g.
+        sentences streamed from the LLM), playing audio back while the
+        remaining segments are still being generated.
+        """
+        logger.info("Streaming TTS request — incremental segments")
 
-                        # Real-time pacing
-                        bytes_per_second = 16000 * 2  # 16-bit PCM
-                        duration = len(audio_chunk) / bytes_per_second
-                        await asyncio.sleep(duration)
+        # Segments already pulled from the iterator, replayed if the pooled
+        # connection has to be swapped before any audio came back
+        sent: list[str] = []
+        # Armed when the first segment is sent; the LLM has its own deadline
+        first_audio = asyncio.timeout(None)
+        timeout = _first_chunk_timeout()
 
-                    else:
-                        # 🔥 Completion event received - exit immediately
-                        logger.info("TTS completion event received: %s", message)
+        async def run(ws, progress: _StreamProgress) -> None:
+
+            async def feed_segments() -> None:
+                for segment in sent:
+                    await ws.convert(segment)
+                iterator = segments.__aiter__()
+                while True:
+                    try:
+                        segment = await iterator.__anext__()
+                    except StopAsyncIteration:
                         break
+                    except Exception:
+                        progress.source_failed = True
+                        raise
+                    sent.append(segment)
+                    if len(sent) == 1 and timeout is not None and not progress.audio_started:
+                        first_audio.reschedule(asyncio.get_running_loop().time() + timeout)
+                    await ws.convert(segment)
+                    logger.info("TTS segment %d sent — %d chars", len(sent), len(segment))
+                # Single flush once the LLM is done; completion event follows it
+                await ws.flush()
+                logger.info("All %d segments sent to TTS stream and flushed", len(sent))
 
-                logger.info("TTS stream completed cleanly")
+            tasks = {
+                asyncio.create_task(feed_segments()),
+                asyncio.create_task(
+                    self._relay_audio(ws, output, progress, first_audio=first_audio)
+                ),
+            }
+            try:
+                # A failing LLM stream must not leave us waiting on a silent socket
+                done, _ = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_EXCEPTION
+                )
+                for task in done:
+                    task.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
+        try:
+            async with first_audio:
+                await self._with_connection(run)
+            logger.info("Incremental TTS stream completed cleanly")
+        except asyncio.TimeoutError:
+            raise self._deadline_exceeded() from None
         except Exception as e:
             logger.error("Streaming TTS failed: %s", e)
             raise TTSServiceError(str(e))
 
+        await output.drain()
+
+    @staticmethod
+    def _deadline_exceeded() -> TTSServiceError:
+        metrics.deadlines_exceeded_total.inc(stage="tts")
+        logger.error("No TTS audio within %d ms", settings.tts_first_chunk_timeout_ms)
+        return TTSServiceError(f"no audio within {settings.tts_first_chunk_timeout_ms} ms")
+
+    async def synthesize(self, text: str) -> bytes:
+        """Whole utterance as pipeline PCM, for playback later."""
+        output = _CollectOutput()
+        await self.stream_synthesize(text, output)
+        return b"".join(output.chunks)
+
+    async def presynthesize(self, texts: list[str]) -> int:
+        """Synthesize fixed phrases into the cache ahead of use; returns how many were added."""
+        if self._cache is None:
+            return 0
+
+        added = 0
+        for text in texts:
+            if self.cache_key(text) in self._cache:
+                continue
+            try:
+                await self.stream_synthesize(text, _DiscardOutput())
+                added += 1
+            except TTSServiceError as e:
+                logger.warning("Pre-synthesis failed for %r: %s", text[:40], e)
+        logger.info("Pre-synthesized %d of %d phrases", added, len(texts))
+        return added
+
     @staticmethod
     def generate_fallback_tone(
         frequency: float = 440.0,
@@ -85,19 +365,7 @@ class SarvamTTSService:
         sample_rate: int = 16000,
         amplitude: int = 3000,
     ) -> bytes:
-        num_samples = int(sample_rate * duration)
-        samples: list[bytes] = []
-
-        for i in range(num_samples):
-            value = int(
-                amplitude
-                * math.sin(
-                    2.0 * math.pi * frequency * i / sample_rate
-                )
-            )
-            samples.append(struct.pack("<h", value))
-
-        tone = b"".join(samples)
+        tone = sine_tone(frequency, duration, sample_rate, amplitude)
         logger.info("Generated fallback tone — %d bytes", len(tone))
         return tone
 
@@ -108,21 +376,28 @@ class SarvamTTSService:
 if __name__ == "__main__":
     import asyncio
 
+    from services.clients import ServiceClients
+
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
     )
 
     async def _test():
-        tts = SarvamTTSService()
+        clients = ServiceClients.from_env()
+        tts = SarvamTTSService(clients.tts_pool, clients.tts_cache)
 
         class DummyWS:
             async def send_bytes(self, data):
                 print(f"Received chunk: {len(data)} bytes")
 
+        egress = AudioEgress(DummyWS())
+        egress.start()
         await tts.stream_synthesize(
             "Vanakkam! How are you today?",
-            DummyWS(),
+            egress,
         )
+        await egress.aclose()
+        await clients.aclose()
 
     asyncio.run(_test())
@@ -0,0 +1,164 @@
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EnergyVAD:
+    """
+    Vectorized energy + zero-crossing voice activity detector for 16-bit PCM.
+
+    ``process`` classifies every ``frame_ms`` frame of a chunk in one NumPy
+    pass and returns only the audio worth sending to STT: speech frames,
+    ``preroll_ms`` of audio before each onset (so word starts are not
+    clipped) and ``hangover_ms`` after the last speech frame (so the remote
+    VAD still sees the trailing silence it needs for END_SPEECH).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold_db: float = -45.0,
+        noise_margin_db: float = 10.0,
+        zcr_max: float = 0.5,
+        hangover_ms: int = 600,
+        preroll_ms: int = 200,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.zcr_max = zcr_max
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+
+        self._carry = b""
+        self._preroll: deque[bytes] = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._hangover_left = 0
+        # Running estimate of background level, adapted on non-speech frames
+        self._noise_floor_db = threshold_db - noise_margin_db
+
+        self.in_speech = False
+        self.speech_ms = 0          # length of the current speech run
+        self.silence_ms = 0         # trailing silence since the last speech frame
+        self.last_speech_at = 0.0   # monotonic time of the last speech frame
+
+        self.frames_total = 0
+        self.frames_speech = 0
+        self.frames_sent = 0
+
+    def classify(self, samples: np.ndarray) -> np.ndarray:
+        """Per-frame speech decision for an (n_frames, frame_samples) int16 array."""
+        frames = samples.astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        level_db = 20.0 * np.log10(rms / 32768.0 + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_samples
+
+        threshold = max(self.threshold_db, self._noise_floor_db + self.noise_margin_db)
+        speech = (level_db > threshold) & (zcr < self.zcr_max)
+
+        quiet = level_db[~speech]
+        if quiet.size:
+            self._noise_floor_db = 0.95 * self._noise_floor_db + 0.05 * float(quiet.mean())
+
+        return speech
+
+    def process(self, pcm: bytes) -> bytes:
+        """Classify a chunk and return the gated audio to forward."""
+        data = self._carry + pcm
+        n_frames = len(data) // self.frame_bytes
+        self._carry = data[n_frames * self.frame_bytes:]
+        if n_frames == 0:
+            return b""
+
+        samples = np.frombuffer(
+            data, dtype="<i2", count=n_frames * self.frame_samples
+        ).reshape(n_frames, self.frame_samples)
+        speech = self.classify(samples)
+
+        self.frames_total += n_frames
+        self.frames_speech += int(speech.sum())
+
+        view = memoryview(data)
+        out: list[bytes] = []
+
+        for index, is_speech in enumerate(speech.tolist()):
+            frame = view[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+
+            if is_speech:
+                if not self.in_speech:
+                    self.in_speech = True
+                    self.speech_ms = 0
+                    out.extend(self._preroll)
+                    self.frames_sent += len(self._preroll)
+                    self._preroll.clear()
+                self.speech_ms += self.frame_ms
+                self.silence_ms = 0
+                self.last_speech_at = time.monotonic()
+                self._hangover_left = self.hangover_frames
+                out.append(frame)
+                self.frames_sent += 1
+                continue
+
+            self.silence_ms += self.frame_ms
+            self.in_speech = False
+            if self._hangover_left > 0:
+                self._hangover_left -= 1
+                out.append(frame)
+                self.frames_sent += 1
+            else:
+                self._preroll.append(bytes(frame))
+
+        return b"".join(out)
+
+    def reset(self) -> None:
+        self._carry = b""
+        self._preroll.clear()
+        self._hangover_left = 0
+        self.in_speech = False
+        self.speech_ms = 0
+        self.silence_ms = 0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "frames_total": self.frames_total,
+            "frames_speech": self.frames_speech,
+            "frames_sent": self.frames_sent,
+            "noise_floor_db": round(self._noise_floor_db, 1),
+        }
+
+
+class LocalEndpointer:
+    """
+    Closes a user turn locally, ahead of the remote END_SPEECH, once the VAD
+    has seen ``silence_ms`` of trailing silence *and* the partial transcript
+    has not changed for ``stable_ms``.
+    """
+
+    def __init__(self, silence_ms: int = 500, stable_ms: int = 300) -> None:
+        self.silence_ms = silence_ms
+        self.stable_ms = stable_ms
+        self._transcript = ""
+        self._changed_at = 0.0
+
+    def transcript_updated(self, transcript: str) -> None:
+        if transcript != self._transcript:
+            self._transcript = transcript
+            self._changed_at = time.monotonic()
+
+    def reset(self) -> None:
+        self._transcript = ""
+        self._changed_at = 0.0
+
+    def should_end(self, vad: EnergyVAD) -> bool:
+        if not self._transcript.strip() or vad.in_speech:
+            return False
+        stable_for = (time.monotonic() - self._changed_at) * 1000
+        return vad.silence_ms >= self.silence_ms and stable_for >= self.stable_ms
@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Awaitable
+
+from services.clients import ServiceClients
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use rather than at startup: IDNA hostname encoding runs
+# on the first outbound TLS connection
+LAZY_IMPORTS = ("encodings.idna",)
+
+
+async def preimport(modules: tuple[str, ...] = LAZY_IMPORTS) -> None:
+    await asyncio.to_thread(lambda: [importlib.import_module(name) for name in modules])
+
+
+async def prime_http(clients: ServiceClients) -> None:
+    """One request to the REST base URL, so DNS, TCP and TLS are done before the first LLM call."""
+    # Any HTTP status will do; only the pooled connection matters
+    await clients.http.get(clients.environment.base)
+
+
+class WarmUp:
+    """
+    Startup work that must finish before this worker takes calls: imports,
+    pooled connections and cached audio. ``/readyz`` reports ready once
+    ``run`` has returned; a step that fails or times out is logged and
+    skipped rather than keeping the worker out of rotation.
+    """
+
+    def __init__(self) -> None:
+        self.done = False
+        self.steps: dict[str, str] = {}
+
+    async def _step(self, name: str, step: Awaitable) -> None:
+        started = time.perf_counter()
+        try:
+            await step
+        except Exception as e:
+            self.steps[name] = "failed"
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.steps[name] = f"{elapsed_ms:.0f} ms"
+        logger.info("Warm-up step %s done in %.0f ms", name, elapsed_ms)
+
+    async def run(self, steps: dict[str, Awaitable], timeout: float) -> None:
+        """Run ``steps`` concurrently for up to ``timeout`` seconds, then mark the worker ready."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._step(name, step) for name, step in steps.items())),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            for name in steps:
+                self.steps.setdefault(name, "timed out")
+            logger.warning("Warm-up not finished after %.0f s — taking calls anyway", timeout)
+        self.done = True
+        logger.info(
+            "Warm-up complete in %.0f ms — ready for calls",
+            (time.perf_counter() - started) * 1000,
+        )
@@ -1,13 +1,32 @@
 import asyncio
 import logging
+import time
+from typing import Awaitable
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from core import metrics
+from core.call_tasks import CallTaskGroup
+from core.config import settings
+from core.session_manager import SessionRejected, current_session, get_session_manager
 from core.state_machine import ConversationState
-from services.greeting_loader import get_greeting
+from services.audio_codec import (
+    AudioFormat,
+    AudioFormatError,
+    ClientAudioSink,
+    IngressTranscoder,
+)
+from services.audio_egress import AudioEgress
+from services.audio_ingress import AudioIngressBuffer
+from services.call_recorder import get_recording_writer, new_call_id
+from services.filler import get_filler_bank
+from services.greeting_loader import load_greeting
+from services.intent_classifier import get_intent_classifier
 from services.llm_service import LLMService
+from services.speculation import SpeculativeResponder
 from services.tts_service import SarvamTTSService
-from services.stt_service import SarvamSTTService
+from services.vad import EnergyVAD, LocalEndpointer
+from services.stt_service import SarvamSTTService, WavFramer
 
 logger = logging.getLogger(__name__)
 
@@ -16,147 +35,623 @@ router = APIRouter()
 
 @router.websocket("/ws/audio")
 async def audio_stream(websocket: WebSocket) -> None:
+    # Accept first: the server drops handshakes left pending for ~10 s, so
+    # queueing for a session slot happens on an open socket
     await websocket.accept()
     client = websocket.client
+    sessions = get_session_manager()
+    try:
+        session = await sessions.admit(f"{client.host}:{client.port}")
+    except SessionRejected as e:
+        await websocket.close(code=e.code, reason=e.reason)
+        return
+    # LLM / TTS slots taken by this call (and its child tasks) are charged to it
+    current_session.set(session)
+
+    # Call setup (greeting LLM + TTS) is timed like a turn, from the accept
+    setup_timer = metrics.TurnTimer("setup")
+    metrics.calls_total.inc()
     logger.info(
         "WebSocket connection opened from %s:%s",
         client.host,
         client.port,
     )
 
-    llm = LLMService()
-    tts = SarvamTTSService()
+    # Client audio format is negotiated per connection (?codec=mulaw&sample_rate=8000)
+    try:
+        audio_format = AudioFormat.from_query(websocket.query_params)
+    except AudioFormatError as e:
+        logger.warning("Rejecting connection — %s", e)
+        await websocket.close(code=1003, reason=str(e))
+        sessions.release(session)
+        return
+    logger.info("Client audio format: %s @ %d Hz", audio_format.codec, audio_format.sample_rate)
+    ingress_transcoder = IngressTranscoder(audio_format)
+    order_id = websocket.query_params.get("order_id")
+
+    # Call recording (QA / disputes): every hook is an in-memory append, a
+    # background writer does the disk I/O
+    recording = get_recording_writer()
+    recorder = recording.open(new_call_id(session.id)) if recording is not None else None
+
+    def record(kind: str, **data) -> None:
+        if recorder is not None:
+            recorder.event(kind, **data)
+
+    record(
+        "call_start",
+        client=f"{client.host}:{client.port}",
+        order_id=order_id,
+        codec=audio_format.codec,
+        sample_rate=audio_format.sample_rate,
+    )
+
+    # TTS writes pipeline PCM into the egress jitter buffer; its writer task
+    # paces fixed frames out through the sink, re-encoded for the client
+    egress = AudioEgress(
+        ClientAudioSink(websocket, audio_format),
+        frame_ms=settings.egress_frame_ms,
+        lead_ms=settings.egress_lead_ms,
+        max_buffer_ms=settings.egress_max_buffer_ms,
+        tap=recorder.outbound if recorder is not None else None,
+        crossfade_ms=settings.filler_crossfade_ms,
+    )
+
+    # Shared clients come from the app lifespan; only history is per-session
+    clients = websocket.app.state.clients
+    # Set when an order feed is configured; the dialer passes ?order_id=
+    greetings = websocket.app.state.greetings
+    llm = LLMService(clients)
+    tts = SarvamTTSService(clients.tts_pool, clients.tts_cache)
+    intents = get_intent_classifier()
+    fillers = get_filler_bank()
     
     # Conversation state
     state = ConversationState.AGENT_SPEAKING
+
+    async def speak_streamed(raw_text: str) -> bool:
+        """Stream LLM sentences straight into TTS; returns end_conversation."""
+        nonlocal state
+        end_call = False
+
+        async def sentences():
+            nonlocal state, end_call
+            async for event_type, data in llm.stream_confirmation(raw_text):
+                if event_type == "sentence":
+                    if state != ConversationState.AGENT_SPEAKING:
+                        # First sentence ready — agent starts talking
+                        state = ConversationState.AGENT_SPEAKING
+                        logger.info("STATE: %s - Agent responding", state.value)
+                    logger.info("LLM sentence: %s", data)
+                    record("agent_sentence", text=data)
+                    yield data
+                elif event_type == "end_conversation":
+                    end_call = data
+                    logger.info("LLM end_conversation: %s", end_call)
+                    record("agent_end_conversation", end_call=end_call)
+
+        await tts.stream_synthesize_iter(sentences(), egress)
+        return end_call
     
-    try:
-        # 🔥 STEP 1: Play greeting (AGENT_SPEAKING)
-        raw_text = get_greeting()
-        confirmation_data = await llm.generate_confirmation(raw_text)
-        confirmation_message = confirmation_data.get("response", str(confirmation_data))
-        logger.info("Confirmation message: %s", confirmation_message)
-        
-        logger.info("STATE: %s - Playing greeting", state.value)
-        await tts.stream_synthesize(confirmation_message, websocket)
+    async def start_up(component: str, step: Awaitable, stage: str | None = None) -> bool:
+        """One call start-up step; a failure is logged, counted and recorded per component"""
+        try:
+            await step
+        except Exception as e:
+            metrics.call_startup_failures_total.inc(component=component)
+            logger.error("Call start-up failed — %s: %s", component, e)
+            record("startup_failed", component=component, error=str(e))
+            return False
+        if stage is not None:
+            setup_timer.mark(stage)
+        return True
+
+    async def play_greeting() -> None:
+        """Opening turn: a pre-rendered greeting, or the order details through LLM → TTS"""
+        rendered = None
+        raw_text = None
+        if greetings is not None and order_id:
+            rendered = await greetings.take(order_id)
+            if rendered is None:
+                raw_text = await greetings.order_details(order_id)
+        if rendered is None and raw_text is None:
+            raw_text = await load_greeting()
+
+        if rendered is not None:
+            # LLM reply and audio were rendered when the order arrived
+            llm.commit_reply(rendered.order.details, rendered.reply)
+            logger.info(
+                "Pre-rendered greeting for order %s: %s",
+                order_id,
+                rendered.reply.get("response", ""),
+            )
+            record("agent_reply", text=rendered.reply.get("response", ""), source="prerendered")
+            metrics.mark("tts_first_chunk")
+            await egress.write(rendered.pcm)
+            await egress.drain()
+        elif settings.llm_streaming:
+            await speak_streamed(raw_text)
+        else:
+            confirmation_data = await llm.generate_confirmation(raw_text)
+            confirmation_message = confirmation_data.get("response", str(confirmation_data))
+            logger.info("Confirmation message: %s", confirmation_message)
+            record("agent_reply", text=confirmation_message, source="llm")
+            await tts.stream_synthesize(confirmation_message, egress)
         logger.info("Greeting completed")
-        
-        # 🔥 STEP 2: Transition to USER_SPEAKING
+        setup_timer.mark("turn_complete")
+
+    egress.start()
+    # Read by /metrics and /admin/sessions at scrape time only
+    session.get_state = lambda: state
+
+    # Warm-up: the STT socket and a spare TTS connection open while the
+    # greeting is generated and played, so the owner's first words go
+    # straight to a connected STT
+    stt = SarvamSTTService(clients.sarvam, close_timeout=settings.call_cancel_timeout)
+    # Every task of the call lives here: when one side ends the rest are
+    # cancelled together, and whatever does not unwind in time is counted
+    tasks = CallTaskGroup(settings.call_cancel_timeout)
+    stt_ready = tasks.spawn(start_up("stt", stt.connect(), stage="stt_connect"), "stt_connect")
+    tasks.spawn(start_up("tts", clients.tts_pool.warm()), "tts_warm")
+
+    # Receive loop → ring buffer → sender task, so a slow STT socket
+    # never stalls websocket.receive()
+    bytes_per_ms = stt.sample_rate * 2 // 1000
+    ingress = AudioIngressBuffer(
+        capacity_bytes=settings.stt_ingress_buffer_ms * bytes_per_ms,
+        window_bytes=settings.stt_window_ms * bytes_per_ms,
+        max_wait=settings.stt_window_ms * 2 / 1000,
+        drop_policy=settings.stt_ingress_drop_policy,
+    )
+
+    # Local VAD: gates silence before STT and feeds the local endpointer
+    vad = None
+    if settings.vad_gating_enabled or settings.endpointer_enabled or settings.vad_barge_in_ms:
+        vad = EnergyVAD(
+            sample_rate=stt.sample_rate,
+            threshold_db=settings.vad_threshold_db,
+            zcr_max=settings.vad_zcr_max,
+            hangover_ms=settings.vad_hangover_ms,
+            preroll_ms=settings.vad_preroll_ms,
+        )
+    endpointer = LocalEndpointer(
+        silence_ms=settings.endpoint_silence_ms,
+        stable_ms=settings.endpoint_stable_ms,
+    )
+
+    async def forward_audio_to_stt():
+        """Buffer audio chunks for STT only during USER_SPEAKING state"""
+        nonlocal state
+
+        try:
+            while True:
+                message = await websocket.receive()
+
+                if message["type"] == "websocket.receive":
+                    audio_bytes = message.get("bytes")
+
+                    if audio_bytes:
+                        # Decode / resample to the 16 kHz PCM the pipeline uses
+                        audio_bytes = ingress_transcoder.process(audio_bytes)
+                        if recorder is not None:
+                            recorder.inbound(audio_bytes)
+
+                        # 🔥 Only forward during USER_SPEAKING, unless barge-in
+                        # needs STT to hear the owner over the agent
+                        if (
+                            state == ConversationState.USER_SPEAKING
+                            or settings.barge_in_enabled
+                        ):
+                            if vad is not None:
+                                gated = vad.process(audio_bytes)
+                                if (
+                                    settings.vad_barge_in_ms
+                                    and vad.speech_ms >= settings.vad_barge_in_ms
+                                ):
+                                    await maybe_barge_in()
+                                if settings.vad_gating_enabled:
+                                    audio_bytes = gated
+                            # Nothing is buffered until STT is connected, so audio
+                            # from early in the greeting never reaches it in a burst
+                            if audio_bytes and stt_ready.done():
+                                ingress.push(audio_bytes)
+                        else:
+                            # Drop audio during AGENT_SPEAKING or PROCESSING
+                            logger.debug(
+                                "Dropping audio chunk (%d bytes) - state: %s",
+                                len(audio_bytes),
+                                state.value,
+                            )
+
+                elif message["type"] == "websocket.disconnect":
+                    logger.info("Client disconnected")
+                    break
+
+        except WebSocketDisconnect:
+            logger.info("Client disconnected (exception)")
+        finally:
+            ingress.close()
+            if vad is not None:
+                logger.info("VAD stats: %s", vad.stats())
+
+    async def send_audio_windows():
+        """Drain the ingress buffer to STT in coalesced WAV windows"""
+        framer = WavFramer(stt.sample_rate, ingress.window_bytes)
+
+        try:
+            while True:
+                count = await ingress.read_window(framer.pcm)
+                if count == 0:
+                    break
+                await stt.send_wav(framer.frame(count))
+        finally:
+            logger.info("Ingress audio stats: %s", ingress.stats())
+            try:
+                await stt.flush()
+            except Exception:
+                pass
+
+    reply_task: asyncio.Task | None = None
+
+    # Speculative LLM on stable partials, only while the owner holds the floor
+    speculator = None
+    if settings.llm_speculation_enabled:
+        speculator = SpeculativeResponder(
+            llm,
+            stable_ms=settings.llm_speculation_stable_ms,
+            max_per_session=settings.llm_speculation_max_per_session,
+            allowed=lambda: state == ConversationState.USER_SPEAKING and not closed_locally,
+        )
+
+    async def respond(user_text: str, timer: metrics.TurnTimer) -> None:
+        """One agent turn (LLM → TTS), run as a task so STT events keep flowing"""
+        nonlocal state
+
+        # Task-local: LLM / TTS services mark their stages on this turn
+        metrics.current_turn.set(timer)
+        egress.on_next_send(lambda: timer.mark("first_byte_sent"))
+        outcome = "failed"
+
+        # Transition to PROCESSING
+        state = ConversationState.PROCESSING
+        logger.info("STATE: %s - Generating response", state.value)
+
+        filler_timer = None
+        if fillers is not None:
+            # Delay counts from END_SPEECH, not from when this task started
+            delay = settings.filler_delay_ms / 1000 - (time.perf_counter() - timer.started_at)
+            filler_timer = asyncio.get_running_loop().call_later(
+                max(0.0, delay), play_filler, timer
+            )
+
+        try:
+            intent = intents.match(user_text) if intents is not None else None
+            response_text = ""
+            if intent is not None:
+                # No fixed response = repeat the previous reply
+                response_text = intent.response or llm.history.last_reply()
+                if not response_text:
+                    intent = None
+            if intents is not None:
+                metrics.intent_lookups_total.inc(result=intent.name if intent else "llm")
+
+            speculative = None
+            if speculator is not None:
+                if intent is not None:
+                    speculator.discard("intent fast path")
+                else:
+                    speculative = await speculator.take(user_text)
+
+            if intent is not None:
+                # Common short reply: pre-approved answer from cached audio, no LLM
+                end_call = intent.end_conversation
+                logger.info("Intent fast path: %s → %s (end_call: %s)", intent.name, response_text, end_call)
+                record("agent_reply", text=response_text, end_call=end_call, source=f"intent:{intent.name}")
+                llm.record_turn(user_text, response_text, end_call)
+
+                state = ConversationState.AGENT_SPEAKING
+                logger.info("STATE: %s - Agent responding", state.value)
+                await tts.stream_synthesize(response_text, egress)
+
+            elif speculative is not None:
+                # Reply generated from the stable partial while the owner finished
+                response_text = speculative.get("response", str(speculative))
+                end_call = speculative.get("end_conversation", False)
+                llm.commit_reply(user_text, speculative)
+                logger.info("Speculative LLM response: %s (end_call: %s)", response_text, end_call)
+                record("agent_reply", text=response_text, end_call=end_call, source="speculative")
+
+                state = ConversationState.AGENT_SPEAKING
+                logger.info("STATE: %s - Agent responding", state.value)
+                await tts.stream_synthesize(response_text, egress)
+
+            elif settings.llm_streaming:
+                # Sentences go to TTS while the LLM is still generating
+                end_call = await speak_streamed(user_text)
+            else:
+                # Generate LLM response (Structured JSON)
+                response_data = await llm.generate_confirmation(user_text)
+                response_text = response_data.get("response", str(response_data))
+                end_call = response_data.get("end_conversation", False)
+
+                logger.info("LLM response: %s (end_call: %s)", response_text, end_call)
+                record("agent_reply", text=response_text, end_call=end_call, source="llm")
+
+                # Transition to AGENT_SPEAKING
+                state = ConversationState.AGENT_SPEAKING
+                logger.info("STATE: %s - Agent responding", state.value)
+
+                # Speak the response
+                await tts.stream_synthesize(response_text, egress)
+            logger.info("Agent response completed")
+            timer.mark("turn_complete")
+            outcome = "completed"
+
+            if end_call:
+                await asyncio.sleep(0.3)
+                logger.info("Bot decided to end the call based on structured LLM response.")
+                await websocket.close()
+                transcripts_task.cancel()
+                return
+
+            # Transition back to USER_SPEAKING
+            state = ConversationState.USER_SPEAKING
+            logger.info("STATE: %s - Listening to user", state.value)
+
+        except asyncio.CancelledError:
+            # Barge-in already moved the state machine on
+            logger.info("Agent turn cancelled")
+            if outcome != "completed":
+                outcome = "cancelled"
+            raise
+
+        except Exception as e:
+            logger.error("Failed to generate/speak response: %s", e)
+            if (
+                "first_byte_sent" not in timer.marks
+                and settings.fallback_prompt
+                and not egress.closed
+            ):
+                # Missed deadline or upstream error before the owner heard
+                # anything: ask them to repeat instead of going silent
+                await play_fallback()
+            # Recover by going back to listening
+            state = ConversationState.USER_SPEAKING
+
+        finally:
+            if filler_timer is not None:
+                filler_timer.cancel()
+            timings = timer.finish(outcome)
+            logger.info("Turn timings (ms, %s): %s", outcome, timings)
+            record("turn_end", outcome=outcome, timings_ms=timings)
+
+    def play_filler(timer: metrics.TurnTimer) -> None:
+        """Reply audio is late: acknowledge the owner until it starts"""
+        if "tts_first_chunk" in timer.marks or timer.finished:
+            return
+        pcm = fillers.pick()
+        if pcm is not None and egress.play_filler(pcm):
+            timer.mark("filler_start")
+            metrics.fillers_played_total.inc()
+            logger.info("Reply not ready — playing filler (%d ms)", len(pcm) / egress.bytes_per_ms)
+
+    async def play_fallback() -> None:
+        nonlocal state
+
+        state = ConversationState.AGENT_SPEAKING
+        logger.info("Playing fallback prompt")
+        record("agent_reply", text=settings.fallback_prompt, source="fallback")
+        metrics.fallback_prompts_total.inc()
+        try:
+            # Pre-synthesized at startup, so normally a cache hit
+            await tts.stream_synthesize(settings.fallback_prompt, egress)
+        except Exception as e:
+            logger.error("Fallback prompt failed: %s", e)
+
+    async def barge_in() -> None:
+        """Owner talked over the agent — stop TTS now and start listening"""
+        nonlocal state
+
+        logger.info("BARGE-IN: owner started speaking during %s", state.value)
+        record("barge_in", state=state.value)
+        # Listening from here on, so a second trigger while the turn
+        # unwinds does nothing
         state = ConversationState.USER_SPEAKING
         logger.info("STATE: %s - Listening to user", state.value)
-        
-        # Start STT session for conversation loop
-        async with SarvamSTTService() as stt:
-            
-            # Create tasks for audio forwarding and transcript reading
-            audio_forward_task = None
-            transcript_read_task = None
-            
-            async def forward_audio_to_stt():
-                """Forward audio chunks to STT only during USER_SPEAKING state"""
-                nonlocal state
-                
-                try:
-                    while True:
-                        message = await websocket.receive()
-                        
-                        if message["type"] == "websocket.receive":
-                            audio_bytes = message.get("bytes")
-                            
-                            if audio_bytes:
-                                # 🔥 Only forward during USER_SPEAKING
-                                if state == ConversationState.USER_SPEAKING:
-                                    await stt.send_audio(audio_bytes)
-                                else:
-                                    # Drop audio during AGENT_SPEAKING or PROCESSING
-                                    logger.debug(
-                                        "Dropping audio chunk (%d bytes) - state: %s",
-                                        len(audio_bytes),
-                                        state.value,
-                                    )
-                        
-                        elif message["type"] == "websocket.disconnect":
-                            logger.info("Client disconnected")
-                            break
-                
-                except WebSocketDisconnect:
-                    logger.info("Client disconnected (exception)")
-                finally:
-                    try:
-                        await stt.flush()
-                    except Exception:
-                        pass
-            
-            async def process_transcripts():
-                """Process STT transcripts and manage conversation turns"""
-                nonlocal state
-                
+
+        reply_task.cancel()
+        # The turn and its TTS readers unwind first, so none of them
+        # writes stale audio after the queued frames are dropped
+        await asyncio.gather(reply_task, return_exceptions=True)
+        egress.clear()
+
+        # Tell the client to drop whatever is still queued for playback
+        try:
+            await websocket.send_json({"type": "clear"})
+        except Exception as e:
+            logger.debug("Could not send clear to client: %s", e)
+
+    async def maybe_barge_in() -> None:
+        if (
+            settings.barge_in_enabled
+            and state == ConversationState.AGENT_SPEAKING
+            and reply_task is not None
+            and not reply_task.done()
+        ):
+            await barge_in()
+
+    async def start_reply(user_text: str) -> None:
+        nonlocal reply_task
+
+        # Turn latency is measured from the end of the user's speech
+        timer = metrics.TurnTimer()
+        logger.info("FINAL TRANSCRIPT: %s", user_text)
+        record("final_transcript", text=user_text)
+
+        if reply_task is not None and not reply_task.done():
+            if settings.barge_in_enabled:
+                # Newer utterance supersedes the pending reply
+                reply_task.cancel()
+            await asyncio.gather(reply_task, return_exceptions=True)
+
+        reply_task = tasks.spawn(respond(user_text, timer), "reply")
+
+    transcript_buffer = ""
+    # Set when the local endpointer closed the turn; transcripts for
+    # that utterance are ignored until the remote VAD catches up
+    closed_locally = False
+
+    async def process_transcripts():
+        """Process STT transcripts and manage conversation turns"""
+        nonlocal transcript_buffer, closed_locally
+
+        try:
+            async for event_type, data in stt.listen_transcripts():
+
+                if event_type == "start_speech":
+                    logger.info("VAD: speech started")
+                    transcript_buffer = ""
+                    closed_locally = False
+                    endpointer.reset()
+                    if speculator is not None:
+                        speculator.transcript_updated("")
+                    await maybe_barge_in()
+
+                elif event_type == "transcript":
+                    if closed_locally:
+                        logger.info("Late transcript after local endpoint ignored: %s", data)
+                        continue
+                    # Accumulate partial transcripts
+                    transcript_buffer = data
+                    endpointer.transcript_updated(data)
+                    if speculator is not None:
+                        speculator.transcript_updated(data)
+                    logger.info("Partial transcript: %s", data)
+
+                elif event_type == "end_speech":
+                    # 🔥 User finished speaking
+                    if closed_locally:
+                        logger.info("Remote END_SPEECH after local endpoint — turn already started")
+                    elif transcript_buffer.strip():
+                        await start_reply(transcript_buffer)
+
+                    # Reset buffer
+                    transcript_buffer = ""
+                    closed_locally = False
+                    endpointer.reset()
+        finally:
+            if speculator is not None:
+                speculator.close()
+
+    async def watch_endpoint():
+        """Close the turn locally once VAD silence + a stable transcript agree"""
+        nonlocal transcript_buffer, closed_locally
+
+        if not settings.endpointer_enabled or vad is None:
+            return
+
+        while not transcripts_task.done():
+            await asyncio.sleep(0.05)
+            if state != ConversationState.USER_SPEAKING or closed_locally:
+                continue
+            if endpointer.should_end(vad):
+                logger.info(
+                    "Local endpoint — %d ms silence, transcript stable",
+                    vad.silence_ms,
+                )
+                user_text = transcript_buffer
                 transcript_buffer = ""
-                
-                async for event_type, data in stt.listen_transcripts():
-                    
-                    if event_type == "start_speech":
-                        logger.info("VAD: speech started")
-                        transcript_buffer = ""
-                    
-                    elif event_type == "transcript":
-                        # Accumulate partial transcripts
-                        transcript_buffer = data
-                        logger.info("Partial transcript: %s", data)
-                    
-                    elif event_type == "end_speech":
-                        # 🔥 User finished speaking
-                        if transcript_buffer.strip():
-                            logger.info("FINAL TRANSCRIPT: %s", transcript_buffer)
-                            
-                            # Transition to PROCESSING
-                            state = ConversationState.PROCESSING
-                            logger.info("STATE: %s - Generating response", state.value)
-                            
-                            try:
-                                # Generate LLM response (Structured JSON)
-                                response_data = await llm.generate_confirmation(
-                                    transcript_buffer
-                                )
-                                response_text = response_data.get("response", str(response_data))
-                                end_call = response_data.get("end_conversation", False)
-
-                                logger.info("LLM response: %s (end_call: %s)", response_text, end_call)
-                                
-                                # Transition to AGENT_SPEAKING
-                                state = ConversationState.AGENT_SPEAKING
-                                logger.info("STATE: %s - Agent responding", state.value)
-                                
-                                # Speak the response
-                                await tts.stream_synthesize(response_text, websocket)
-                                logger.info("Agent response completed")
-                                
-                                if end_call:
-                                    await asyncio.sleep(0.3)
-                                    logger.info("Bot decided to end the call based on structured LLM response.")
-                                    await websocket.close()
-                                    break
-                                
-                                # Transition back to USER_SPEAKING
-                                state = ConversationState.USER_SPEAKING
-                                logger.info("STATE: %s - Listening to user", state.value)
-                                
-                            except Exception as e:
-                                logger.error("Failed to generate/speak response: %s", e)
-                                # Recover by going back to listening
-                                state = ConversationState.USER_SPEAKING
-                        
-                        # Reset buffer
-                        transcript_buffer = ""
-            
-            # 🔥 Run both tasks concurrently
-            await asyncio.gather(
-                forward_audio_to_stt(),
-                process_transcripts(),
-            )
+                closed_locally = True
+                endpointer.reset()
+                await start_reply(user_text)
+
+    async def greet() -> None:
+        """Opening turn, run as the first reply so a hangup or barge-in cuts it short"""
+        nonlocal state
+
+        # Task-local: LLM / TTS services mark their stages on the setup turn
+        metrics.current_turn.set(setup_timer)
+        egress.on_next_send(lambda: setup_timer.mark("first_byte_sent"))
+        try:
+            # drain() raises once the client is gone, so a greeting that
+            # completes has been sent in full
+            greeted = await start_up("greeting", play_greeting())
+        except asyncio.CancelledError:
+            if state == ConversationState.USER_SPEAKING:
+                # Barge-in; a hangup is counted as failed when the call ends
+                setup_timer.finish("cancelled")
+            raise
+        if not greeted:
+            # Already reported per component; the call cannot go on
+            await websocket.close(code=1011)
+            receive_task.cancel()
+            return
+        setup_timings = setup_timer.finish()
+        logger.info("Call setup timings (ms): %s", setup_timings)
+        record("setup_complete", timings_ms=setup_timings)
+
+        # 🔥 STEP 2: Transition to USER_SPEAKING
+        state = ConversationState.USER_SPEAKING
+        logger.info("STATE: %s - Listening to user", state.value)
+
+    try:
+        # The receive loop runs from the start: a hangup during the greeting
+        # ends the call like any other
+        receive_task = tasks.spawn(forward_audio_to_stt(), "receive", critical=True)
+        tasks.spawn(egress.wait_closed(), "egress", critical=True)
+
+        # 🔥 STEP 1: Play greeting (AGENT_SPEAKING) as the first reply, so
+        # the owner can talk over it like over any other
+        logger.info("STATE: %s - Playing greeting", state.value)
+        reply_task = tasks.spawn(greet(), "greeting")
+
+        if await tasks.wait_first(stt_ready) is not stt_ready:
+            # Client gone before STT connected
+            return
+        if not stt_ready.result():
+            # Already reported; the call cannot go on
+            await websocket.close(code=1011)
+            return
+
+        # STT connected during the greeting; its sender and listener start
+        # now, so barge-in works on the rest of the greeting too
+        async with stt:
+            # 🔥 The call is over as soon as the client, the STT sender, the
+            # STT listener or the egress stops
+            tasks.spawn(send_audio_windows(), "stt_send", critical=True)
+            transcripts_task = tasks.spawn(process_transcripts(), "stt_listen", critical=True)
+            tasks.spawn(watch_endpoint(), "endpoint")
+            try:
+                await tasks.wait_first()
+            finally:
+                # Before the STT socket closes under them
+                await tasks.aclose()
 
     except Exception as e:
         logger.error("Voice session failed: %s", e)
 
     finally:
+        # No-op if the greeting completed
+        setup_timer.finish("failed")
+        sessions.release(session)
+        llm.close()
+        # No-op if the conversation loop already closed the group
+        leaked_tasks = await tasks.aclose()
+        try:
+            # Only still open if the call ended before the conversation loop
+            await stt.close()
+        except Exception as e:
+            logger.debug("STT close failed: %s", e)
+        await egress.aclose()
+
+        # Anything still open now stays open after the call: count it
+        leaks = {"task": leaked_tasks, "stt": int(stt.close_timed_out), **session.inflight}
+        for resource, count in leaks.items():
+            if count:
+                metrics.call_leaks_total.inc(count, resource=resource)
+        if any(leaks.values()):
+            logger.warning("Call ended with resources still open: %s", leaks)
+        if recorder is not None:
+            record("call_end", egress=egress.stats(), dropped_bytes=recorder.dropped_bytes, leaks=leaks)
+            recorder.close()
         logger.info("WebSocket session ended")
@@ -0,0 +1,368 @@
+"""
+Local stand-in for the Sarvam endpoints the voice server uses, for load
+tests without a network connection:
+
+- ``/speech-to-text/ws``   streaming STT (energy VAD → partials, END_SPEECH)
+- ``/v1/chat/completions`` chat completions, whole-body or SSE streamed
+- ``/text-to-speech/ws``   streaming TTS (silence-level PCM, completion event)
+
+Every response is delayed by a configurable latency plus random jitter.
+Point the server at it with ``SARVAM_BASE_URL`` / ``SARVAM_WS_URL``, or let
+``python -m bench.run`` wire everything up.
+
+    python -m bench.fake_sarvam --port 9000 --llm-first-token-ms 300
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, fields
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+WAV_HEADER_BYTES = 44
+
+
+@dataclass
+class FakeProfile:
+    # STT
+    stt_latency_ms: float = 150.0
+    stt_jitter_ms: float = 50.0
+    stt_partial_every_ms: float = 400.0
+    stt_endpoint_silence_ms: float = 600.0
+    stt_threshold_db: float = -40.0
+    # LLM
+    llm_first_token_ms: float = 400.0
+    llm_token_ms: float = 20.0
+    llm_jitter_ms: float = 100.0
+    # TTS
+    tts_first_chunk_ms: float = 250.0
+    tts_jitter_ms: float = 80.0
+    tts_ms_per_char: float = 60.0
+    tts_chunk_ms: float = 200.0
+    tts_speed: float = 4.0              # audio generated this many times faster than real time
+    # Conversation
+    end_after_turns: int = 0            # >0: reply end_conversation=true after this many user turns
+    transcript: str = "ஆமா, ஆர்டர் சரிதான்"
+    reply: str = "சரி, உங்கள் ஆர்டரை உறுதி செய்துவிட்டேன். வேறு ஏதாவது உதவி வேண்டுமா?"
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        group = parser.add_argument_group("fake Sarvam profile")
+        for field in fields(cls):
+            group.add_argument(
+                "--" + field.name.replace("_", "-"),
+                type=type(field.default),
+                default=field.default,
+            )
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "FakeProfile":
+        return cls(**{field.name: getattr(args, field.name) for field in fields(cls)})
+
+    def to_argv(self) -> list[str]:
+        argv: list[str] = []
+        for field in fields(self):
+            argv += ["--" + field.name.replace("_", "-"), str(getattr(self, field.name))]
+        return argv
+
+
+def _delay(latency_ms: float, jitter_ms: float) -> float:
+    return max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+
+
+class _DelayedSender:
+    """
+    Sends JSON messages on a websocket after a per-message delay while
+    preserving order, without blocking the receive loop.
+    """
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self._websocket = websocket
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_due = 0.0
+        self._task = asyncio.create_task(self._run())
+
+    def send(self, message: dict, delay: float) -> None:
+        due = max(time.monotonic() + delay, self._last_due)
+        self._last_due = due
+        self._queue.put_nowait((due, message))
+
+    async def _run(self) -> None:
+        while True:
+            due, message = await self._queue.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._websocket.send_text(json.dumps(message))
+
+    async def close(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def create_app(profile: FakeProfile) -> FastAPI:
+    app = FastAPI(title="Fake Sarvam")
+    stats = {
+        "stt_sessions": 0,
+        "stt_audio_messages": 0,
+        "stt_turns": 0,
+        "chat_requests": 0,
+        "tts_connections": 0,
+        "tts_texts": 0,
+        "tts_audio_bytes": 0,
+    }
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return stats
+
+    # -------------------------
+    # STT
+    # -------------------------
+
+    @app.websocket("/speech-to-text/ws")
+    async def speech_to_text(websocket: WebSocket) -> None:
+        await websocket.accept()
+        stats["stt_sessions"] += 1
+        sender = _DelayedSender(websocket)
+        words = profile.transcript.split()
+
+        in_speech = False
+        speech_ms = 0.0
+        silence_ms = 0.0
+        next_partial_ms = profile.stt_partial_every_ms
+
+        def emit(message: dict) -> None:
+            sender.send(message, _delay(profile.stt_latency_ms, profile.stt_jitter_ms))
+
+        def event(signal: str) -> dict:
+            return {
+                "type": "events",
+                "data": {"event_type": "vad", "signal_type": signal, "occured_at": time.time()},
+            }
+
+        def transcript(text: str) -> dict:
+            return {
+                "type": "data",
+                "data": {
+                    "request_id": uuid.uuid4().hex,
+                    "transcript": text,
+                    "language_code": "ta-IN",
+                    "metrics": {
+                        "audio_duration": speech_ms / 1000,
+                        "processing_latency": profile.stt_latency_ms / 1000,
+                    },
+                },
+            }
+
+        def end_turn() -> None:
+            nonlocal in_speech, speech_ms, next_partial_ms
+            emit(transcript(profile.transcript))
+            emit(event("END_SPEECH"))
+            stats["stt_turns"] += 1
+            in_speech = False
+            speech_ms = 0.0
+            next_partial_ms = profile.stt_partial_every_ms
+
+        try:
+            while True:
+                message = json.loads(await websocket.receive_text())
+
+                if message.get("type") == "flush":
+                    if in_speech:
+                        end_turn()
+                    continue
+
+                audio = message.get("audio")
+                if not audio:
+                    continue
+                stats["stt_audio_messages"] += 1
+
+                data = base64.b64decode(audio["data"])
+                if data[:4] == b"RIFF":
+                    data = data[WAV_HEADER_BYTES:]
+                sample_rate = int(audio.get("sample_rate") or 16000)
+                frame = sample_rate // 50  # 20 ms
+                n_frames = len(data) // 2 // frame
+                if n_frames == 0:
+                    continue
+
+                samples = np.frombuffer(data, dtype="<i2", count=n_frames * frame)
+                frames = samples.reshape(n_frames, frame).astype(np.float32)
+                rms = np.sqrt(np.mean(frames * frames, axis=1))
+                speech = 20.0 * np.log10(rms / 32768.0 + 1e-10) > profile.stt_threshold_db
+
+                for is_speech in speech.tolist():
+                    if is_speech:
+                        if not in_speech:
+                            in_speech = True
+                            emit(event("START_SPEECH"))
+                        speech_ms += 20
+                        silence_ms = 0.0
+                        if speech_ms >= next_partial_ms:
+                            # Partial grows with the amount of speech heard
+                            count = max(1, min(len(words), int(speech_ms // profile.stt_partial_every_ms)))
+                            emit(transcript(" ".join(words[:count])))
+                            next_partial_ms += profile.stt_partial_every_ms
+                    else:
+                        silence_ms += 20
+                        if in_speech and silence_ms >= profile.stt_endpoint_silence_ms:
+                            end_turn()
+
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await sender.close()
+
+    # -------------------------
+    # Chat completions
+    # -------------------------
+
+    def reply_for(messages: list[dict]) -> str:
+        if messages and "open_questions" in messages[0].get("content", ""):
+            # History summarisation request (see HISTORY_SUMMARY_PROMPT)
+            return json.dumps(
+                {"confirmed": [profile.transcript], "open_questions": []},
+                ensure_ascii=False,
+            )
+        user_turns = sum(1 for m in messages if m.get("role") == "user") - 1  # first is the greeting
+        end = profile.end_after_turns > 0 and user_turns >= profile.end_after_turns
+        return json.dumps(
+            {"response": profile.reply, "end_conversation": end},
+            ensure_ascii=False,
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["chat_requests"] += 1
+        content = reply_for(body.get("messages", []))
+        completion_id = "chatcmpl-" + uuid.uuid4().hex
+        created = int(time.time())
+        model = body.get("model", "sarvam-m")
+        # ~4 characters per token
+        tokens = [content[i:i + 4] for i in range(0, len(content), 4)]
+
+        if not body.get("stream"):
+            await asyncio.sleep(
+                _delay(profile.llm_first_token_ms, profile.llm_jitter_ms)
+                + len(tokens) * profile.llm_token_ms / 1000
+            )
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+        async def events():
+            def chunk(delta: dict, finish_reason: str | None = None) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            await asyncio.sleep(_delay(profile.llm_first_token_ms, profile.llm_jitter_ms))
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                yield chunk({"content": token})
+                await asyncio.sleep(profile.llm_token_ms / 1000)
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # -------------------------
+    # TTS
+    # -------------------------
+
+    @app.websocket("/text-to-speech/ws")
+    async def text_to_speech(websocket: WebSocket) -> None:
+        await websocket.accept()
+        stats["tts_connections"] += 1
+        jobs: asyncio.Queue = asyncio.Queue()
+        sample_rate = 22050
+
+        async def synthesize() -> None:
+            while True:
+                kind, text = await jobs.get()
+                if kind == "flush":
+                    await websocket.send_text(json.dumps(
+                        {"type": "event", "data": {"event_type": "final", "message": "done"}}
+                    ))
+                    continue
+
+                await asyncio.sleep(_delay(profile.tts_first_chunk_ms, profile.tts_jitter_ms))
+                total_ms = len(text) * profile.tts_ms_per_char
+                chunk_bytes = int(sample_rate * profile.tts_chunk_ms / 1000) * 2
+                # Quiet noise rather than digital silence, like real speech gaps
+                audio = np.random.randint(-64, 64, int(sample_rate * total_ms / 1000), dtype=np.int16)
+                pcm = audio.astype("<i2").tobytes()
+
+                for offset in range(0, len(pcm), chunk_bytes):
+                    chunk = pcm[offset:offset + chunk_bytes]
+                    await websocket.send_text(json.dumps({
+                        "type": "audio",
+                        "data": {"content_type": "audio/pcm", "audio": base64.b64encode(chunk).decode("ascii")},
+                    }))
+                    stats["tts_audio_bytes"] += len(chunk)
+                    await asyncio.sleep(len(chunk) / 2 / sample_rate / profile.tts_speed)
+
+        worker = asyncio.create_task(synthesize())
+        try:
+            while True:
+                message = json.loads(await websocket.receive_text())
+                kind = message.get("type")
+                if kind == "config":
+                    sample_rate = int(message["data"].get("speech_sample_rate") or sample_rate)
+                elif kind == "text":
+                    stats["tts_texts"] += 1
+                    jobs.put_nowait(("text", message["data"]["text"]))
+                elif kind == "flush":
+                    jobs.put_nowait(("flush", None))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Sarvam STT / chat / TTS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--seed", type=int, default=None)
+    FakeProfile.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    uvicorn.run(create_app(FakeProfile.from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Headless load client for ``/ws/audio``.
+
+Each simulated call streams 16 kHz PCM in real time like a microphone
+(silence between turns), waits for the agent to finish speaking, plays a
+recorded utterance, and measures how long the agent takes to answer.
+
+    python -m bench.load_client --url ws://127.0.0.1:8000/ws/audio --sessions 50 --turns 3
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+import wave
+from dataclasses import dataclass, field
+
+import httpx
+import numpy as np
+import websockets
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class CallResult:
+    ttfa: float | None = None                   # connect → first greeting audio
+    turn_latencies: list[float] = field(default_factory=list)
+    completed: bool = False
+    error: str | None = None
+    duration: float = 0.0
+
+
+def load_utterance(path: str | None) -> bytes:
+    """16 kHz mono 16-bit PCM from a WAV / raw file, or a synthetic voiced burst."""
+    if path is None:
+        t = np.arange(int(SAMPLE_RATE * 1.2)) / SAMPLE_RATE
+        envelope = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.05)
+        tone = sum(np.sin(2 * np.pi * f * t) / n for n, f in enumerate((180, 360, 540, 720), 1))
+        return (6000 * envelope * tone).astype("<i2").tobytes()
+
+    if path.endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+                raise SystemExit(f"{path}: expected 16 kHz mono 16-bit PCM")
+            return wav.readframes(wav.getnframes())
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class _Call:
+    def __init__(self, args: argparse.Namespace, utterance: bytes, url: str) -> None:
+        self.args = args
+        self.url = url
+        self.utterance = utterance
+        self.frame_bytes = SAMPLE_RATE * args.frame_ms // 1000 * 2
+        self.silence = bytes(self.frame_bytes)
+        self.result = CallResult()
+
+        self.connected_at = 0.0
+        self.first_audio_at: float | None = None
+        self.last_audio_at: float | None = None
+        self.speech_end_at: float | None = None
+        self.reply_audio = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.close_status = ""
+
+    def agent_quiet(self, now: float) -> bool:
+        return (
+            self.last_audio_at is not None
+            and (now - self.last_audio_at) * 1000 >= self.args.agent_quiet_ms
+        )
+
+    async def receive(self, ws) -> None:
+        try:
+            async for message in ws:
+                if not isinstance(message, bytes):
+                    continue  # {"type": "clear"} etc.
+                now = time.monotonic()
+                if self.first_audio_at is None:
+                    self.first_audio_at = now
+                    self.result.ttfa = now - self.connected_at
+                if self.speech_end_at is not None and not self.reply_audio.is_set():
+                    self.result.turn_latencies.append(now - self.speech_end_at)
+                    self.reply_audio.set()
+                self.last_audio_at = now
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            # e.g. 1013 "saturated" from admission control
+            if ws.close_code is not None:
+                self.close_status = f" ({ws.close_code} {ws.close_reason})".rstrip()
+            self.closed.set()
+
+    async def send(self, ws) -> None:
+        """Real-time microphone: one frame per frame_ms on an absolute schedule."""
+        frame_s = self.args.frame_ms / 1000
+        started = time.monotonic()
+        sent = 0
+
+        async def send_frame(frame: bytes) -> None:
+            nonlocal sent
+            delay = started + sent * frame_s - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send(frame)
+            sent += 1
+
+        async def idle_until(done) -> None:
+            deadline = time.monotonic() + self.args.turn_timeout
+            while not done():
+                if self.closed.is_set():
+                    raise ConnectionError(f"server closed the call{self.close_status}")
+                if time.monotonic() > deadline:
+                    raise TimeoutError("timed out waiting for the agent")
+                await send_frame(self.silence)
+
+        await idle_until(lambda: self.agent_quiet(time.monotonic()))
+        for _ in range(self.args.turns):
+            self.speech_end_at = None
+            self.reply_audio.clear()
+            for offset in range(0, len(self.utterance), self.frame_bytes):
+                frame = self.utterance[offset:offset + self.frame_bytes]
+                await send_frame(frame.ljust(self.frame_bytes, b"\0"))
+            self.speech_end_at = time.monotonic()
+
+            await idle_until(self.reply_audio.is_set)
+            try:
+                await idle_until(lambda: self.agent_quiet(time.monotonic()))
+            except (ConnectionError, websockets.ConnectionClosed):
+                # The agent hung up after replying (end_conversation): done
+                return
+
+    async def run(self) -> CallResult:
+        self.connected_at = time.monotonic()
+        try:
+            async with websockets.connect(
+                self.url, max_size=None, open_timeout=self.args.turn_timeout
+            ) as ws:
+                receiver = asyncio.create_task(self.receive(ws))
+                try:
+                    await self.send(ws)
+                    self.result.completed = True
+                finally:
+                    receiver.cancel()
+                    await asyncio.gather(receiver, return_exceptions=True)
+        except Exception as e:
+            self.result.error = f"{type(e).__name__}: {e}"
+        self.result.duration = time.monotonic() - self.connected_at
+        return self.result
+
+
+async def scrape_metrics(client: httpx.AsyncClient, url: str) -> dict[str, float]:
+    """Unlabelled samples plus histogram buckets, keyed by their full series name."""
+    samples: dict[str, float] = {}
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return samples
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def histogram_quantile(before: dict, after: dict, name: str, q: float) -> float | None:
+    """Prometheus-style quantile over the buckets observed between two scrapes."""
+    prefix = f'{name}_bucket{{le="'
+    buckets = []
+    for series, value in after.items():
+        if series.startswith(prefix):
+            bound = series[len(prefix):-2]
+            buckets.append((math.inf if bound == "+Inf" else float(bound), value - before.get(series, 0.0)))
+    buckets.sort()
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return lower_bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / max(count - lower_count, 1e-9)
+        lower_bound, lower_count = bound, count
+    return None
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    utterance = load_utterance(args.pcm)
+    calls = args.calls or args.sessions
+    slots = asyncio.Semaphore(args.sessions)
+    results: list[CallResult] = []
+
+    metrics_url = args.metrics_url or (
+        args.url.replace("ws://", "http://").replace("wss://", "https://").split("/ws/")[0] + "/metrics"
+    )
+    peak = {"rss": 0.0, "sessions": 0.0}
+
+    async def sample_server(client: httpx.AsyncClient) -> None:
+        while True:
+            samples = await scrape_metrics(client, metrics_url)
+            peak["rss"] = max(peak["rss"], samples.get("process_resident_memory_bytes", 0.0))
+            peak["sessions"] = max(peak["sessions"], samples.get("voice_active_sessions", 0.0))
+            await asyncio.sleep(1.0)
+
+    async def one_call(index: int) -> None:
+        # Spread the first wave over the ramp so setup is not one thundering herd
+        if index < args.sessions:
+            await asyncio.sleep(args.ramp * index / args.sessions)
+        url = args.url
+        if args.order_prefix:
+            # One order per call, pre-rendered by the server's order feed
+            url += ("&" if "?" in url else "?") + f"order_id={args.order_prefix}{index}"
+        async with slots:
+            results.append(await _Call(args, utterance, url).run())
+
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        before = await scrape_metrics(client, metrics_url)
+        sampler = asyncio.create_task(sample_server(client))
+        started = time.monotonic()
+        await asyncio.gather(*(one_call(i) for i in range(calls)))
+        wall = time.monotonic() - started
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+        after = await scrape_metrics(client, metrics_url)
+
+    completed = [r for r in results if r.completed]
+    ttfa = [r.ttfa for r in results if r.ttfa is not None]
+    turns = [latency for r in results for latency in r.turn_latencies]
+    errors: dict[str, int] = {}
+    for r in results:
+        if r.error:
+            errors[r.error] = errors.get(r.error, 0) + 1
+
+    def ms(value: float | None) -> float | None:
+        return None if value is None else round(value * 1000, 1)
+
+    baseline_rss = before.get("process_resident_memory_bytes", 0.0)
+    lag_max = after.get("voice_event_loop_lag_max_seconds")
+
+    def lag_quantile(q: float) -> float | None:
+        # Interpolating inside a bucket can overshoot the largest value seen
+        value = histogram_quantile(before, after, "voice_event_loop_lag_seconds", q)
+        return value if value is None or lag_max is None else min(value, lag_max)
+    return {
+        "calls": calls,
+        "concurrency": args.sessions,
+        "completed": len(completed),
+        "failed": calls - len(completed),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "calls_per_s": round(len(completed) / wall, 3) if wall else None,
+        "ttfa_ms": {f"p{p}": ms(percentile(ttfa, p)) for p in (50, 90, 99)},
+        "turn_latency_ms": {
+            "count": len(turns),
+            **{f"p{p}": ms(percentile(turns, p)) for p in (50, 90, 95, 99)},
+            "max": ms(max(turns)) if turns else None,
+        },
+        "server": {
+            "loop_lag_ms": {
+                "p50": ms(lag_quantile(0.5)),
+                "p99": ms(lag_quantile(0.99)),
+                "max": ms(lag_max),
+            },
+            "rss_baseline_mb": round(baseline_rss / 2**20, 1),
+            "rss_peak_mb": round(peak["rss"] / 2**20, 1),
+            "peak_sessions": int(peak["sessions"]),
+            "rss_per_session_kb": (
+                round((peak["rss"] - baseline_rss) / peak["sessions"] / 1024, 1)
+                if peak["sessions"] and baseline_rss else None
+            ),
+        },
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("load client")
+    group.add_argument("--url", default="ws://127.0.0.1:8000/ws/audio")
+    group.add_argument("--metrics-url", default=None, help="default: derived from --url")
+    group.add_argument("--sessions", type=int, default=10, help="concurrent calls")
+    group.add_argument("--calls", type=int, default=0, help="total calls (default: --sessions)")
+    group.add_argument("--turns", type=int, default=3, help="user turns per call")
+    group.add_argument("--ramp", type=float, default=5.0, help="seconds over which the first calls start")
+    group.add_argument("--pcm", default=None, help="16 kHz mono 16-bit .wav / raw PCM utterance")
+    group.add_argument("--frame-ms", type=int, default=20)
+    group.add_argument("--agent-quiet-ms", type=int, default=800, help="agent silence that means its turn ended")
+    group.add_argument("--turn-timeout", type=float, default=30.0)
+    group.add_argument("--order-prefix", default="", help="connect call N with ?order_id=<prefix>N")
+    group.add_argument("--json", action="store_true", help="print the report as JSON only")
+
+
+def print_report(report: dict, as_json: bool = False) -> None:
+    if as_json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    server = report["server"]
+    print(f"calls            {report['completed']}/{report['calls']} completed "
+          f"at concurrency {report['concurrency']} in {report['wall_s']} s "
+          f"({report['calls_per_s']} calls/s)")
+    if report["errors"]:
+        for error, count in report["errors"].items():
+            print(f"  {count} × {error}")
+    print(f"time to audio    {report['ttfa_ms']}")
+    print(f"turn latency     {report['turn_latency_ms']}")
+    print(f"event-loop lag   {server['loop_lag_ms']}")
+    print(f"server RSS       baseline {server['rss_baseline_mb']} MB, peak {server['rss_peak_mb']} MB "
+          f"with {server['peak_sessions']} sessions ({server['rss_per_session_kb']} kB/session)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless /ws/audio load client")
+    add_arguments(parser)
+    args = parser.parse_args()
+    print_report(asyncio.run(run_load(args)), args.json)
+
+
+if __name__ == "__main__":
+    main()
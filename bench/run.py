@@ -0,0 +1,138 @@
+"""
+One-shot offline load test: starts the fake Sarvam server and the voice
+server (pointed at the fake) as subprocesses, drives them with the
+headless client and prints the report.
+
+    python -m bench.run --sessions 50 --turns 3 --llm-first-token-ms 600
+
+Server settings (VAD_GATING_ENABLED, LLM_STREAMING, ...) are taken from
+the environment as usual. Subprocess logs are written to a temp directory
+and kept when the run ends.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.fake_sarvam import FakeProfile
+from bench.load_client import add_arguments, print_report, run_load, scrape_metrics
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{url}: process exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{url}: not ready after {timeout:.0f} s")
+
+
+def _write_orders(directory: Path, prefix: str, count: int) -> None:
+    directory.mkdir()
+    details = (ROOT / "app" / "data" / "greeting.txt").read_text(encoding="utf-8").strip()
+    for index in range(count):
+        (directory / f"{prefix}{index}.txt").write_text(details, encoding="utf-8")
+
+
+async def _wait_prerendered(metrics_url: str, count: int, timeout: float = 120.0) -> None:
+    series = 'voice_greeting_prerenders_total{outcome="rendered"}'
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while time.monotonic() < deadline:
+            if (await scrape_metrics(client, metrics_url)).get(series, 0) >= count:
+                return
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"greetings not pre-rendered after {timeout:.0f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test against fake Sarvam services")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--prerender", action="store_true",
+        help="feed one order per call through ORDER_FEED=file and wait for the renders first",
+    )
+    add_arguments(parser)
+    FakeProfile.add_arguments(parser)
+    args = parser.parse_args()
+
+    log_dir = Path(tempfile.mkdtemp(prefix="voice_ai_bench_"))
+    fake_port, app_port = _free_port(), _free_port()
+    processes: list[subprocess.Popen] = []
+
+    try:
+        fake_argv = ["--port", str(fake_port)] + FakeProfile.from_args(args).to_argv()
+        if args.seed is not None:
+            fake_argv += ["--seed", str(args.seed)]
+        with open(log_dir / "fake_sarvam.log", "wb") as log:
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "bench.fake_sarvam", *fake_argv],
+                cwd=ROOT, stdout=log, stderr=subprocess.STDOUT,
+            ))
+        _wait_ready(f"http://127.0.0.1:{fake_port}/stats", processes[-1])
+
+        env = {
+            **os.environ,
+            "SARVAM_API_KEY": "bench",
+            "SARVAM_BASE_URL": f"http://127.0.0.1:{fake_port}",
+            "SARVAM_WS_URL": f"ws://127.0.0.1:{fake_port}",
+            "TTS_CACHE_DIR": str(log_dir / "tts_cache"),
+        }
+        if args.prerender:
+            args.order_prefix = args.order_prefix or "bench-"
+            _write_orders(log_dir / "orders", args.order_prefix, args.calls or args.sessions)
+            env.update(ORDER_FEED="file", ORDER_FEED_PATH=str(log_dir / "orders"))
+        with open(log_dir / "server.log", "wb") as log:
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app",
+                 "--host", "127.0.0.1", "--port", str(app_port), "--log-level", "warning"],
+                cwd=ROOT / "app", env=env, stdout=log, stderr=subprocess.STDOUT,
+            ))
+        _wait_ready(f"http://127.0.0.1:{app_port}/readyz", processes[-1])
+
+        args.url = f"ws://127.0.0.1:{app_port}/ws/audio"
+        args.metrics_url = None
+        if args.prerender:
+            asyncio.run(_wait_prerendered(
+                f"http://127.0.0.1:{app_port}/metrics", args.calls or args.sessions
+            ))
+        report = asyncio.run(run_load(args))
+        report["fake_sarvam"] = httpx.get(f"http://127.0.0.1:{fake_port}/stats").json()
+        print_report(report, args.json)
+        if not args.json:
+            print(f"fake Sarvam      {report['fake_sarvam']}")
+            print(f"logs             {log_dir}")
+
+    finally:
+        # Server first, so its sessions end before the fake drops their sockets
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The service runs from app/ (``from services...``); tests import it the same way
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
@@ -0,0 +1,82 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services.llm_service import LLMService
+
+ORDER = "Order #42: 2 chicken biryani, 1 raita, deliver to Anna Nagar by 8 pm"
+GREETING = {"response": "Vanakkam. Order 42 is two chicken biryani and a raita. Shall I confirm it?", "end_conversation": False}
+REPLY = {"response": "Done, it is confirmed.", "end_conversation": False}
+
+
+class FakeLLM(LLMService):
+    """LLMService whose streamed completions come from canned replies, recording every prompt."""
+
+    def __init__(self, replies: list[dict], token_delay: float = 0.0) -> None:
+        super().__init__(SimpleNamespace(sarvam=None))
+        self.replies = list(replies)
+        self.token_delay = token_delay
+        self.prompts: list[list[dict]] = []
+
+    async def _stream_deltas(self, messages):
+        self.prompts.append(messages)
+        text = json.dumps(self.replies.pop(0))
+        for start in range(0, len(text), 8):
+            await asyncio.sleep(self.token_delay)
+            yield text[start:start + 8]
+
+
+async def _speak(llm: LLMService, raw_text: str, spoken: list[str], playback: float) -> None:
+    """What the call handler does with a streamed reply: play each sentence as it arrives."""
+    async for event_type, data in llm.stream_confirmation(raw_text):
+        if event_type == "sentence":
+            spoken.append(data)
+            await asyncio.sleep(playback)
+
+
+async def _barge_in_during_greeting(token_delay: float, playback: float) -> FakeLLM:
+    llm = FakeLLM([GREETING, REPLY], token_delay=token_delay)
+    spoken: list[str] = []
+    greeting = asyncio.create_task(_speak(llm, ORDER, spoken, playback))
+    while not spoken:
+        await asyncio.sleep(0.001)
+    # Owner talks over the greeting
+    greeting.cancel()
+    await asyncio.gather(greeting, return_exceptions=True)
+
+    await _speak(llm, "Yes, that's right", [], 0.0)
+    return llm
+
+
+@pytest.mark.parametrize(
+    "token_delay, playback",
+    [
+        (0.005, 0.0),  # cut off while the LLM is still streaming
+        (0.0, 1.0),  # cut off while a sentence plays, the stream parked at a yield
+    ],
+)
+def test_barge_in_during_greeting_keeps_order_in_next_prompt(token_delay, playback):
+    llm = asyncio.run(_barge_in_during_greeting(token_delay, playback))
+
+    prompt = llm.prompts[-1]
+    assert [message["role"] for message in prompt] == ["system", "user", "assistant", "user"]
+    assert prompt[1]["content"] == ORDER
+    assert prompt[2]["content"].startswith('{"response": "Vanakkam.')
+    assert prompt[3]["content"] == "Yes, that's right"
+
+
+def test_completed_greeting_is_committed_once():
+    async def run() -> FakeLLM:
+        llm = FakeLLM([GREETING, REPLY])
+        await _speak(llm, ORDER, [], 0.0)
+        await _speak(llm, "Yes, that's right", [], 0.0)
+        return llm
+
+    prompt = asyncio.run(run()).prompts[-1]
+    assert [message["content"] for message in prompt[1:]] == [
+        ORDER,
+        json.dumps(GREETING),
+        "Yes, that's right",
+    ]
@@ -11,6 +11,7 @@ function App() {
   const micStreamRef = useRef(null);
   const processorRef = useRef(null);
   const silentGainRef = useRef(null);
+  const playingSourcesRef = useRef(new Set());
 
   const addLog = (msg) => {
     setLog((prev) => [
@@ -83,6 +84,18 @@ function App() {
     // RECEIVE TTS AUDIO (16kHz PCM)
     // ===============================
     ws.onmessage = (event) => {
+      // Control messages arrive as JSON text frames
+      if (typeof event.data === "string") {
+        const msg = JSON.parse(event.data);
+        if (msg.type === "clear") {
+          // Barge-in: drop everything still queued for playback
+          playingSourcesRef.current.forEach((source) => source.stop());
+          playingSourcesRef.current.clear();
+          addLog("Playback cleared (barge-in)");
+        }
+        return;
+      }
+
       if (!(event.data instanceof ArrayBuffer)) return;
 
       const audioCtx = audioCtxRef.current;
@@ -106,6 +119,8 @@ function App() {
       const source = audioCtx.createBufferSource();
       source.buffer = buffer;
       source.connect(audioCtx.destination);
+      source.onended = () => playingSourcesRef.current.delete(source);
+      playingSourcesRef.current.add(source);
       source.start();
 
       addLog(`Playing audio chunk (${event.data.byteLength} bytes)`);